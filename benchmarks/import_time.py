@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Import-time guard for the installer's startup path.
+Runs `python -X importtime` on the installer modules, reports the slowest
+imports, and fails if the total exceeds the startup budget or if any module
+that is meant to be loaded lazily was imported at startup.
+
+Usage: python benchmarks/import_time.py [--budget-ms 400] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules that make up the path from launch to the installer window.
+STARTUP_MODULES = ["launch_installer", "robot_installer", "ui.installer_ui", "ui.welcome_ui"]
+
+# Heavy packages that must only be imported by the feature that uses them.
+LAZY_PACKAGES = ["flask", "flask_cors", "werkzeug", "waitress", "PIL", "lerobot", "serial", "draccus", "torch"]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(modules):
+    """Returns (self_us, cumulative_us, depth, name) for every import made by `modules`."""
+    code = "; ".join(f"import {name}" for name in modules)
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{process.stderr[-2000:]}")
+
+    imports = []
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the installer's import-time budget.")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Maximum total import time in milliseconds.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    args = parser.parse_args()
+
+    imports = measure(STARTUP_MODULES)
+    total_ms = sum(self_us for self_us, _, _, _ in imports) / 1000
+
+    print("Slowest imports (cumulative):")
+    top_level = [entry for entry in imports if entry[2] == 0]
+    for _, cumulative_us, _, name in sorted(top_level, key=lambda entry: -entry[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"Total: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = sorted({name for _, _, _, name in imports if name.split('.')[0] in LAZY_PACKAGES})
+    if eager:
+        print(f"FAIL: lazily loaded packages were imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports exceed the budget by {total_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Load test for the robot test server.
+Starts the server headless on simulated arms whose leader keeps moving, so
+telemetry streams carry deltas as well as keyframes (or targets --url), drives
+each endpoint scenario from --concurrency keep-alive connections for
+--duration seconds while --streams telemetry clients stay connected, and
+reports p50/p95/p99 latency and throughput per scenario.
+
+Results are compared against benchmarks/baselines/server_load.json and the
+run fails when p95 latency, throughput or the telemetry frame rate regress
+by more than --tolerance. Each scenario runs --runs times and the median run
+is kept, which evens out scheduler noise; record baselines with several runs.
+Use --save-baseline to record the current results as the new baseline.
+
+Usage: python benchmarks/server_load.py [--concurrency 8] [--duration 10] [--streams 2] [--runs 1]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "server_load.json")
+
+# name -> (method, path, JSON body)
+SCENARIOS = {
+    'chat': ('POST', '/api/chat', {'message': 'status'}),
+    'teleop_stats': ('GET', '/api/teleop/stats', None),
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def start_server(threads):
+    """Starts the headless server on a free port and returns (process, url)."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "installation.test_server", "--simulate", "--move", "--quiet", "--port", "0", "--threads", str(threads)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Serving on "):
+        process.kill()
+        raise RuntimeError(f"The test server did not start:\n{line}{process.stdout.read()}")
+    # Keep reading the server's output (e.g. waitress queue-depth warnings); a full pipe would block the server.
+    threading.Thread(target=process.stdout.read, daemon=True).start()
+    return process, line.split()[2]
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGINT if os.name == 'posix' else signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_scenario(url, method, path, body, concurrency, duration):
+    """Sends requests back to back from `concurrency` connections; returns the results dict."""
+    parts = urlsplit(url)
+    payload = json.dumps(body) if body is not None else None
+    headers = {'Content-Type': 'application/json'} if payload else {}
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(1000 * percentile(latencies, 0.50), 2),
+        'p95_ms': round(1000 * percentile(latencies, 0.95), 2),
+        'p99_ms': round(1000 * percentile(latencies, 0.99), 2),
+    }
+
+
+class TelemetryClient:
+    """Holds one /api/telemetry stream open and counts the frames it receives."""
+
+    def __init__(self, url, hz):
+        self.parts = urlsplit(url)
+        self.path = f"/api/telemetry?hz={hz}"
+        self.frames = 0
+        self.first_frame = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection(self.parts.hostname, self.parts.port, timeout=10)
+            connection.request('GET', self.path)
+            response = connection.getresponse()
+            if response.status != 200:
+                self.error = f"HTTP {response.status}"
+                return
+            while not self._stop.is_set():
+                line = response.fp.readline()
+                if not line:
+                    break
+                if line.startswith(b"event: "):
+                    self.frames += 1
+                    if self.first_frame is None:
+                        self.first_frame = time.perf_counter() - started
+            connection.close()
+        except (OSError, http.client.HTTPException) as e:
+            self.error = str(e)
+
+    def stop(self):
+        self._stop.set()
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of regressions of `results` against `baseline`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if 'frames_per_s' in result and 'frames_per_s' in base:
+            if result['frames_per_s'] < base['frames_per_s'] * (1 - tolerance):
+                regressions.append(f"{name}: {result['frames_per_s']} frames/s vs baseline {base['frames_per_s']} frames/s")
+            continue
+        if 'p95_ms' not in result:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if result['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput_rps']} req/s vs baseline {base['throughput_rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Target a running server instead of starting one.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Connections per scenario.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario.")
+    parser.add_argument("--streams", type=int, default=2, help="Telemetry clients connected during the run.")
+    parser.add_argument("--stream-hz", type=float, default=20, help="Rate requested by each telemetry client.")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per scenario; the median run is reported.")
+    parser.add_argument("--threads", type=int, default=8, help="Worker threads for the started server.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression against the baseline.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.threads)
+    try:
+        clients = [TelemetryClient(url, args.stream_hz) for _ in range(args.streams)]
+        for client in clients:
+            client.start()
+
+        results = {}
+        for name, (method, path, body) in SCENARIOS.items():
+            runs = [run_scenario(url, method, path, body, args.concurrency, args.duration)
+                    for _ in range(max(1, args.runs))]
+            runs.sort(key=lambda r: r['throughput_rps'])
+            results[name] = runs[len(runs) // 2]
+            print(f"{name}: {results[name]}")
+
+        for client in clients:
+            client.stop()
+        elapsed = args.duration * len(SCENARIOS) * max(1, args.runs)
+        first_frames = [c.first_frame for c in clients if c.first_frame is not None]
+        results['telemetry'] = {
+            'clients': len(clients),
+            'errors': sum(1 for c in clients if c.error),
+            'frames_per_s': round(sum(c.frames for c in clients) / elapsed / max(1, len(clients)), 1),
+            'first_frame_ms': round(1000 * percentile(first_frames, 0.5), 2),
+        }
+        print(f"telemetry: {results['telemetry']}")
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    key = f"concurrency={args.concurrency}"
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, 'r') as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[key] = results
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {key} to {BASELINE_PATH}")
+        return 0
+
+    failures = [f"{name}: {r['errors']} errors" for name, r in results.items() if r.get('errors')]
+    if key in baselines:
+        failures += compare(results, baselines[key], args.tolerance)
+    else:
+        print(f"No baseline for {key}; run with --save-baseline to record one.")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Control-rate check for the teleoperation loop.
+Runs the leader -> follower loop against simulated six-motor buses, prints
+the timing statistics and fails if the loop falls short of its target
+rate or overruns more than the allowed fraction of ticks.
+
+Usage: python benchmarks/teleop_loop.py [--rate 200] [--seconds 3] [--max-overrun 0.01]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from installation.dynamixel import DynamixelBus
+from installation.dynamixel_sim import SimulatedMotor, SimulatedSerial
+from installation.teleop import JointCalibration, TeleopEngine
+
+MOTOR_IDS = range(1, 7)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=200, help="Target control rate in Hz.")
+    parser.add_argument("--seconds", type=float, default=3, help="How long to run the loop.")
+    parser.add_argument("--max-overrun", type=float, default=0.01, help="Allowed fraction of overrunning ticks.")
+    args = parser.parse_args()
+
+    leader = SimulatedSerial([SimulatedMotor(i, 1_000_000, 1190) for i in MOTOR_IDS])
+    follower = SimulatedSerial([SimulatedMotor(i, 1_000_000, 1200) for i in MOTOR_IDS])
+    calibration = {i: JointCalibration(0, 4095) for i in MOTOR_IDS}
+    engine = TeleopEngine(DynamixelBus(leader), DynamixelBus(follower), MOTOR_IDS, calibration, calibration, rate_hz=args.rate)
+
+    engine.start()
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        # Move the leader so every tick carries new positions.
+        for motor in leader.motors:
+            motor.set('present_position', (motor.get('present_position') + 7) % 4096)
+        time.sleep(0.01)
+    engine.stop()
+
+    stats = engine.stats.snapshot()
+    print(json.dumps(stats, indent=2))
+    failures = []
+    if stats['actual_hz'] < 0.98 * args.rate:
+        failures.append(f"rate {stats['actual_hz']} Hz is below the {args.rate} Hz target")
+    if stats['overruns'] > args.max_overrun * stats['ticks']:
+        failures.append(f"{stats['overruns']} of {stats['ticks']} ticks overran")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
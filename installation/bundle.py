@@ -0,0 +1,163 @@
+"""
+Portable offline install bundles.
+A bundle is a single tar archive holding the lerobot checkout, the wheels
+and conda packages from the package cache (including ffmpeg and the
+dynamixel-sdk wheel), and, when conda-pack is available, the packed conda
+environment itself. Importing one restores an installation without any
+network access.
+"""
+
+import io
+import json
+import os
+import shlex
+import shutil
+import tarfile
+import tempfile
+import time
+
+from installation.step_journal import StepJournal
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "bundle.json"
+CHECKOUT_DIR = "lerobot"
+PACKED_ENV_NAME = "env.tar.gz"
+CACHE_DIR = "cache"
+CONDA_PACKAGE_SUFFIXES = ('.conda', '.tar.bz2')
+
+
+def _extract(tar, members, dest):
+    if hasattr(tarfile, 'data_filter'):
+        tar.extractall(dest, members=members, filter='data')
+    else:
+        tar.extractall(dest, members=members)
+
+
+def export_bundle(archive_path, install_dir, package_cache, env_path=None, commit=None, run=None):
+    """
+    Writes a bundle for an existing installation to `archive_path`.
+
+    `run` is called with a shell command and returns success; it is used to
+    pack the conda env with conda-pack. Without conda-pack (or an env) the
+    bundle carries only the cached wheels and conda packages, which is
+    enough to rebuild the env offline. Returns the bundle manifest.
+    """
+    manifest = {'format': BUNDLE_FORMAT, 'created': time.time(), 'commit': commit, 'env': 'wheels'}
+
+    with tempfile.TemporaryDirectory() as staging:
+        packed_env = os.path.join(staging, PACKED_ENV_NAME)
+        if env_path and run and shutil.which('conda-pack'):
+            # Editable installs point at this machine's checkout; they are re-linked on import.
+            if run(f"conda-pack -p {shlex.quote(env_path)} -o {shlex.quote(packed_env)} --ignore-editable-packages"):
+                manifest['env'] = 'packed'
+
+        tmp_path = archive_path + ".tmp"
+        with tarfile.open(tmp_path, 'w') as tar:
+            data = json.dumps(manifest, indent=2).encode('utf-8')
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(data)
+            info.mtime = int(manifest['created'])
+            tar.addfile(info, io.BytesIO(data))
+
+            def skip_journal(member):
+                return None if os.path.basename(member.name) == StepJournal.FILENAME else member
+            tar.add(install_dir, arcname=CHECKOUT_DIR, filter=skip_journal)
+
+            if manifest['env'] == 'packed':
+                tar.add(packed_env, arcname=PACKED_ENV_NAME)
+
+            tar.add(package_cache.wheelhouse, arcname=f"{CACHE_DIR}/wheels")
+            for name in sorted(os.listdir(package_cache.conda_pkgs)):
+                if name.endswith(CONDA_PACKAGE_SUFFIXES):
+                    tar.add(os.path.join(package_cache.conda_pkgs, name), arcname=f"{CACHE_DIR}/conda-pkgs/{name}")
+            if os.path.exists(package_cache.manifest_path):
+                tar.add(package_cache.manifest_path, arcname=f"{CACHE_DIR}/{package_cache.MANIFEST}")
+        os.replace(tmp_path, archive_path)
+
+    return manifest
+
+
+def read_manifest(archive_path):
+    """Reads and validates the manifest of a bundle."""
+    with tarfile.open(archive_path, 'r') as tar:
+        try:
+            manifest = json.load(tar.extractfile(MANIFEST_NAME))
+        except KeyError:
+            raise RuntimeError(f"{archive_path} is not a LeRobot install bundle.")
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise RuntimeError(f"Unsupported bundle format {manifest.get('format')} in {archive_path}.")
+    return manifest
+
+
+def unpack_checkout(archive_path, install_dir, commit=None, current_commit=None):
+    """
+    Extracts the lerobot checkout into `install_dir`. An existing directory
+    is accepted only if it is already at the bundle's commit, so a retried
+    import does not unpack twice.
+    """
+    if os.path.exists(install_dir):
+        if commit and commit == current_commit:
+            return True
+        raise RuntimeError(f"{install_dir} already exists. Choose an empty install directory to import a bundle.")
+
+    parent = os.path.dirname(install_dir)
+    os.makedirs(parent, exist_ok=True)
+    # Extract next to the target so the final move is a rename on the same filesystem.
+    staging = tempfile.mkdtemp(dir=parent, prefix=".lerobot-import-")
+    try:
+        with tarfile.open(archive_path, 'r') as tar:
+            members = [m for m in tar.getmembers() if m.name == CHECKOUT_DIR or m.name.startswith(CHECKOUT_DIR + "/")]
+            _extract(tar, members, staging)
+        os.replace(os.path.join(staging, CHECKOUT_DIR), install_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return True
+
+
+def seed_cache(archive_path, package_cache):
+    """Copies the bundle's wheels and conda packages into the local package cache."""
+    prefix = CACHE_DIR + "/"
+    with tempfile.TemporaryDirectory() as staging:
+        with tarfile.open(archive_path, 'r') as tar:
+            members = [m for m in tar.getmembers() if m.name.startswith(prefix)]
+            _extract(tar, members, staging)
+
+        cache_root = os.path.join(staging, CACHE_DIR)
+        for sub, target in (("wheels", package_cache.wheelhouse), ("conda-pkgs", package_cache.conda_pkgs)):
+            source = os.path.join(cache_root, sub)
+            if not os.path.isdir(source):
+                continue
+            for name in os.listdir(source):
+                dest = os.path.join(target, name)
+                if not os.path.exists(dest):
+                    shutil.move(os.path.join(source, name), dest)
+
+        manifest_path = os.path.join(cache_root, package_cache.MANIFEST)
+        if os.path.exists(manifest_path):
+            package_cache.merge(manifest_path)
+    return True
+
+
+def restore_packed_env(archive_path, env_path, run):
+    """
+    Extracts a conda-packed env to `env_path` and rewrites its prefixes with
+    conda-unpack. An env left by an earlier, successful attempt is kept.
+    """
+    if os.path.exists(env_path):
+        return True
+    os.makedirs(env_path)
+    try:
+        with tarfile.open(archive_path, 'r') as tar:
+            packed = tar.extractfile(PACKED_ENV_NAME)
+            with tarfile.open(fileobj=packed, mode='r|gz') as env_tar:
+                if hasattr(tarfile, 'data_filter'):
+                    env_tar.extractall(env_path, filter='tar')
+                else:
+                    env_tar.extractall(env_path)
+        unpack = os.path.join(env_path, "Scripts" if os.name == 'nt' else "bin", "conda-unpack")
+        if not run(shlex.quote(unpack)):
+            raise RuntimeError("conda-unpack failed for the restored environment.")
+    except Exception:
+        shutil.rmtree(env_path, ignore_errors=True)
+        raise
+    return True
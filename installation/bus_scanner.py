@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Motor inventory for the arms' Dynamixel buses.
+Each supported baud rate is swept with a single broadcast ping, which every
+motor listening at that rate answers in ID order, instead of pinging IDs
+one by one. The follower and leader buses are scanned at the same time on
+separate threads.
+
+The ping window bounds how long each broadcast waits for replies. A scan
+that knows how many motors to expect first tries the short window covering
+the Koch IDs, and only sweeps the full Protocol 2.0 range (0-252) when that
+finds fewer motors than expected, so a motor left at an unusual ID is still
+found. Without an expected count the full range is always swept. Passing
+`max_id` explicitly limits the scan to that window.
+
+Run directly to scan ports from the command line:
+    python -m installation.bus_scanner /dev/ttyACM0 /dev/ttyACM1
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from installation import dynamixel
+
+# Rates in the order they are tried: the rate lerobot configures, then the factory default.
+SUPPORTED_BAUDRATES = (1_000_000, 57_600, 115_200, 2_000_000, 3_000_000, 4_000_000, 9_600)
+
+# Koch arms use IDs 1-6; a little headroom keeps the first broadcast ping window short.
+QUICK_MAX_ID = 20
+
+
+class MotorInfo:
+    """A motor found on a bus."""
+
+    def __init__(self, motor_id, baudrate, model_number, firmware_version):
+        self.id = motor_id
+        self.baudrate = baudrate
+        self.model_number = model_number
+        self.firmware_version = firmware_version
+
+    @property
+    def model(self):
+        return dynamixel.MODEL_NAMES.get(self.model_number, f"model {self.model_number}")
+
+    def __repr__(self):
+        return f"MotorInfo(id={self.id}, baudrate={self.baudrate}, model={self.model!r})"
+
+
+def open_serial(port, baudrate=1_000_000):
+    """Opens a real serial port for a Dynamixel bus."""
+    import serial
+    return serial.Serial(port, baudrate=baudrate, timeout=0.001)
+
+
+def scan_bus(bus, baudrates=SUPPORTED_BAUDRATES, max_id=None, expected=None):
+    """
+    Returns every motor that answers on `bus` at any of `baudrates`, sorted
+    by baud rate and ID. With `max_id` only IDs up to it are scanned;
+    otherwise the full ID range is, after a quick pass if `expected` motors
+    are known to be connected.
+    """
+    if max_id is not None:
+        return _ping_all(bus, baudrates, max_id)
+    if expected is not None:
+        motors = _ping_all(bus, baudrates, QUICK_MAX_ID)
+        if len(motors) >= expected:
+            return motors
+    return _ping_all(bus, baudrates, dynamixel.MAX_ID)
+
+
+def _ping_all(bus, baudrates, max_id):
+    motors = []
+    # Other users of a shared bus must not send packets while it is at a scan rate.
+    with bus.lock:
+        original = bus.baudrate
+        try:
+            for baudrate in baudrates:
+                bus.baudrate = baudrate
+                for motor_id, (model, firmware) in sorted(bus.broadcast_ping(max_id).items()):
+                    motors.append(MotorInfo(motor_id, baudrate, model, firmware))
+        finally:
+            bus.baudrate = original
+    return motors
+
+
+def scan_buses(buses, baudrates=SUPPORTED_BAUDRATES, max_id=None, expected=None):
+    """
+    Scans several open buses in parallel. `buses` maps a role (e.g.
+    'follower') to a DynamixelBus and `expected` optionally maps a role to
+    its motor count; returns role -> list of MotorInfo, or role -> the
+    exception raised if that bus could not be scanned.
+    """
+    expected = expected or {}
+    inventory = {}
+    with ThreadPoolExecutor(max_workers=len(buses) or 1) as pool:
+        futures = {role: pool.submit(scan_bus, bus, baudrates, max_id, expected.get(role))
+                   for role, bus in buses.items()}
+        for role, future in futures.items():
+            try:
+                inventory[role] = future.result()
+            except Exception as e:
+                inventory[role] = e
+    return inventory
+
+
+def scan_ports(ports, open_serial=open_serial, baudrates=SUPPORTED_BAUDRATES, max_id=None, expected=None):
+    """Opens each port (role -> port name), scans them all in parallel and closes them again."""
+    serials = {}
+    inventory = {}
+    try:
+        for role, port in ports.items():
+            try:
+                serials[role] = open_serial(port)
+            except Exception as e:
+                inventory[role] = e
+        buses = {role: dynamixel.DynamixelBus(serial) for role, serial in serials.items()}
+        inventory.update(scan_buses(buses, baudrates, max_id, expected))
+    finally:
+        for serial in serials.values():
+            serial.close()
+    return {role: inventory[role] for role in ports}
+
+
+def describe(motors):
+    """A one-line summary of an inventory, for logs."""
+    if isinstance(motors, Exception):
+        return f"scan failed ({motors})"
+    if not motors:
+        return "no motors found"
+    return ", ".join(f"ID {m.id} {m.model} @ {m.baudrate}" for m in motors)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m installation.bus_scanner PORT [PORT ...]")
+        return 2
+    inventory = scan_ports({port: port for port in sys.argv[1:]})
+    for port, motors in inventory.items():
+        print(f"{port}: {describe(motors)}")
+    return 0 if all(isinstance(motors, list) for motors in inventory.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Fast clone strategies for the lerobot repository.
+A clone reads objects from a local mirror when one is available, and is
+otherwise made shallow or blob-less, so the full history is never
+downloaded unless asked for. Objects taken from a mirror are copied into
+the checkout (--dissociate), so the mirror can later be moved or deleted
+without breaking the clone.
+"""
+
+import os
+import re
+import subprocess
+
+REPO_URL = "https://github.com/huggingface/lerobot.git"
+
+# Cheapest first. 'reference' copies objects from a local mirror, 'shallow'
+# fetches a single commit, 'partial' fetches all commits but downloads file
+# contents on demand, and 'full' is a plain clone.
+STRATEGIES = ('reference', 'shallow', 'partial', 'full')
+
+# `--filter` for partial clones needs git 2.19 or newer.
+PARTIAL_CLONE_MIN_GIT = (2, 19)
+
+
+def git_version():
+    """Returns the installed git version as a tuple, or None if git is missing."""
+    try:
+        process = subprocess.run(["git", "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+)\.(\d+)", process.stdout)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def is_mirror(path):
+    """True if `path` is a git repository (bare or not) usable with --reference."""
+    if not path or not os.path.isdir(path):
+        return False
+    return os.path.isdir(os.path.join(path, "objects")) or os.path.isdir(os.path.join(path, ".git", "objects"))
+
+
+def available_strategies(preferred='auto', mirror=None, version=None):
+    """
+    Lists the strategies to try in order. With 'auto' that is every strategy
+    this machine supports, cheapest first; otherwise the preferred one,
+    followed by a plain clone as the last resort.
+    """
+    version = version or git_version()
+    supported = []
+    for name in STRATEGIES:
+        if name == 'reference' and not is_mirror(mirror):
+            continue
+        if name == 'partial' and (version is None or version < PARTIAL_CLONE_MIN_GIT):
+            continue
+        supported.append(name)
+
+    if preferred == 'auto':
+        return supported
+    if preferred not in STRATEGIES:
+        raise ValueError(f"Unknown clone strategy '{preferred}'. Expected one of: auto, {', '.join(STRATEGIES)}")
+    ordered = [preferred] if preferred in supported else []
+    return ordered + (['full'] if preferred != 'full' else [])
+
+
+def clone_command(strategy, url, dest, mirror=None):
+    """Builds the `git clone` argument list for a strategy."""
+    if strategy in ('shallow', 'partial') and os.path.isdir(url):
+        # git ignores --depth and --filter for plain local paths.
+        url = "file://" + os.path.abspath(url)
+    args = ["git", "clone"]
+    if strategy == 'reference':
+        args += ["--reference-if-able", mirror, "--dissociate"]
+    elif strategy == 'shallow':
+        args += ["--depth", "1", "--single-branch"]
+    elif strategy == 'partial':
+        args += ["--filter=blob:none"]
+    return args + [url, dest]
+
+
+def verify_checkout(dest):
+    """Checks that a clone produced a readable HEAD commit and a populated work tree."""
+    try:
+        process = subprocess.run(["git", "-C", dest, "rev-parse", "--verify", "HEAD^{commit}"],
+                                 capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    if process.returncode != 0:
+        return False
+    return any(name != ".git" for name in os.listdir(dest))
@@ -0,0 +1,159 @@
+"""
+Line-streaming command runner for the installer.
+Output is forwarded line by line while the command runs instead of being
+captured and logged once it exits, and pip/conda output is parsed into a
+completion fraction for the step that runs it. The amount of output
+forwarded is capped in encoded bytes by an OutputBudget, which a step can
+share between all the commands it runs.
+"""
+
+import collections
+import os
+import re
+import subprocess
+
+
+class CommandResult:
+    """Outcome of a streamed command."""
+
+    def __init__(self, returncode, output_bytes, dropped_bytes, tail):
+        self.returncode = returncode
+        self.output_bytes = output_bytes
+        self.dropped_bytes = dropped_bytes
+        self.tail = tail
+
+    @property
+    def success(self):
+        return self.returncode == 0
+
+
+class OutputBudget:
+    """A cap, in UTF-8 bytes, on the output forwarded for one step."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.dropped_bytes = 0
+
+    def take(self, size):
+        """Returns True if `size` more bytes fit within the cap, counting them either way."""
+        if self.used_bytes + size <= self.max_bytes:
+            self.used_bytes += size
+            return True
+        self.dropped_bytes += size
+        return False
+
+
+class PipProgressParser:
+    """Estimates the progress of a `pip install` from its phase markers."""
+
+    def __init__(self):
+        self.fraction = 0.0
+        self.collected = 0
+
+    def feed(self, line):
+        """Returns a new fraction if the line moved progress forward, else None."""
+        text = line.strip()
+        if text.startswith(("Collecting ", "Obtaining ", "Processing ", "Requirement already satisfied")):
+            # The number of packages is not known up front, so collection
+            # approaches but never reaches the next phase.
+            self.collected += 1
+            fraction = 0.6 * self.collected / (self.collected + 10)
+        elif text.startswith("Building wheel"):
+            fraction = 0.65
+        elif text.startswith("Installing collected packages"):
+            fraction = 0.8
+        elif text.startswith("Successfully installed"):
+            fraction = 1.0
+        else:
+            return None
+        return self._advance(fraction)
+
+    def _advance(self, fraction):
+        if fraction <= self.fraction:
+            return None
+        self.fraction = fraction
+        return fraction
+
+
+class CondaProgressParser(PipProgressParser):
+    """Estimates the progress of a `conda create`/`conda install` from its phases."""
+
+    PHASES = [
+        ("Collecting package metadata", 0.1),
+        ("Solving environment", 0.25),
+        ("Downloading and Extracting Packages", 0.4),
+        ("Preparing transaction", 0.7),
+        ("Verifying transaction", 0.8),
+        ("Executing transaction", 0.9),
+    ]
+    PERCENT = re.compile(r"\|\s*(\d{1,3})%\s*$")
+
+    def feed(self, line):
+        text = line.strip()
+        for marker, fraction in self.PHASES:
+            if text.startswith(marker):
+                return self._advance(fraction)
+        match = self.PERCENT.search(text)
+        if match and 0.4 <= self.fraction < 0.7:
+            # Per-package download bars only move within the download phase.
+            return self._advance(0.4 + 0.29 * min(int(match.group(1)), 100) / 100)
+        return None
+
+
+def parser_for_command(command):
+    """Picks a progress parser based on the tool a command runs, or None."""
+    words = command.split() if isinstance(command, str) else list(command)
+    names = {os.path.basename(word) for word in words}
+    if names & {"pip", "pip3"}:
+        return PipProgressParser()
+    if "conda" in names and names & {"create", "install"}:
+        return CondaProgressParser()
+    return None
+
+
+def run_streaming(command, on_line, cwd=None, max_output_bytes=512 * 1024,
+                  tail_lines=50, on_progress=None, shell=True, env=None, budget=None):
+    """
+    Runs a command and calls `on_line` for each line of combined stdout/stderr
+    as soon as it is printed.
+
+    Lines are read from the pipe only as fast as `on_line` handles them, so a
+    slow consumer makes the child block on a full pipe rather than letting
+    output pile up in memory. Once `max_output_bytes` have been forwarded
+    (or `budget` is used up, when one is shared across commands) the rest of
+    the output is drained and dropped, except for the last `tail_lines`
+    lines which are kept in the result for error reporting. `env` adds to,
+    rather than replaces, the current environment.
+    """
+    budget = budget or OutputBudget(max_output_bytes)
+    parser = parser_for_command(command) if on_progress else None
+    process_env = {**os.environ, "PYTHONUNBUFFERED": "1", **(env or {})}
+    process = subprocess.Popen(
+        command, shell=shell, cwd=cwd, env=process_env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, errors='replace', bufsize=1,
+    )
+
+    output_bytes = 0
+    dropped_bytes = 0
+    tail = collections.deque(maxlen=tail_lines)
+    try:
+        for line in process.stdout:
+            line = line.rstrip('\r\n')
+            size = len(line.encode('utf-8', 'replace')) + 1
+            tail.append(line)
+            if budget.take(size):
+                output_bytes += size
+                on_line(line)
+            else:
+                dropped_bytes += size
+            if parser:
+                fraction = parser.feed(line)
+                if fraction is not None:
+                    on_progress(fraction)
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    return CommandResult(returncode, output_bytes, dropped_bytes, list(tail))
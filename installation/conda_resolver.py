@@ -0,0 +1,150 @@
+"""
+Cached conda environment discovery.
+Environments are found by reading conda's own bookkeeping files
+(environments.txt and .condarc) instead of running `conda env list`, and
+executables are resolved to paths inside the env instead of `conda run`.
+The result is cached until one of the files it was read from changes.
+"""
+
+import os
+import shutil
+import threading
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_envs_dirs(condarc_path):
+    """Reads the `envs_dirs` list from a .condarc without needing a YAML parser."""
+    dirs = []
+    try:
+        with open(condarc_path, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return dirs
+
+    in_list = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped.startswith('envs_dirs:'):
+            inline = stripped[len('envs_dirs:'):].strip()
+            if inline.startswith('['):
+                dirs += [d.strip().strip('\'"') for d in inline.strip('[]').split(',') if d.strip()]
+            else:
+                in_list = True
+            continue
+        if in_list:
+            if stripped.startswith('- '):
+                dirs.append(stripped[2:].strip().strip('\'"'))
+            elif not line[0].isspace():
+                in_list = False
+    return [os.path.expanduser(os.path.expandvars(d)) for d in dirs]
+
+
+class CondaResolver:
+    """Finds conda, its environments and their executables, caching the answer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._state = None
+        self._conda_exe_path = None
+
+    def _conda_exe(self):
+        # The PATH search runs once; afterwards only the found path is re-checked.
+        if self._conda_exe_path and os.path.exists(self._conda_exe_path):
+            return self._conda_exe_path
+        # CONDA_EXE is set by `conda init`, which avoids the PATH search entirely.
+        conda_exe = os.environ.get("CONDA_EXE")
+        if not (conda_exe and os.path.exists(conda_exe)):
+            conda_exe = shutil.which('conda')
+        self._conda_exe_path = conda_exe
+        return conda_exe
+
+    def _watched_files(self, base_dir):
+        home = os.path.expanduser("~")
+        files = [
+            os.path.join(home, ".conda", "environments.txt"),
+            os.path.join(home, ".condarc"),
+            os.path.join(home, ".config", "conda", ".condarc"),
+            os.environ.get("CONDARC", ""),
+        ]
+        if base_dir:
+            files += [os.path.join(base_dir, ".condarc"), os.path.join(base_dir, "envs")]
+        return [f for f in files if f]
+
+    def _current(self):
+        """Returns the cached state, re-reading it only if a watched file changed."""
+        with self._lock:
+            conda_exe = self._conda_exe()
+            base_dir = os.path.dirname(os.path.dirname(conda_exe)) if conda_exe else None
+            watched = self._watched_files(base_dir)
+            signature = (conda_exe, tuple((path, _mtime(path)) for path in watched))
+            if signature != self._signature:
+                self._state = self._discover(conda_exe, base_dir, watched)
+                self._signature = signature
+            return self._state
+
+    def _discover(self, conda_exe, base_dir, watched):
+        envs_dirs = []
+        for path in watched:
+            if os.path.basename(path) == ".condarc":
+                envs_dirs += _read_envs_dirs(path)
+        if base_dir:
+            envs_dirs.append(os.path.join(base_dir, "envs"))
+
+        prefixes = []
+        environments_txt = os.path.join(os.path.expanduser("~"), ".conda", "environments.txt")
+        try:
+            with open(environments_txt, 'r') as f:
+                prefixes += [line.strip() for line in f if line.strip()]
+        except OSError:
+            pass
+        for envs_dir in envs_dirs:
+            try:
+                prefixes += [os.path.join(envs_dir, name) for name in sorted(os.listdir(envs_dir))]
+            except OSError:
+                pass
+
+        envs = {}
+        for prefix in prefixes:
+            # conda-meta marks a real environment; environments.txt can list deleted ones.
+            if os.path.isdir(os.path.join(prefix, "conda-meta")):
+                envs.setdefault(os.path.basename(os.path.normpath(prefix)), prefix)
+        return {'conda_exe': conda_exe, 'base_dir': base_dir, 'envs_dirs': envs_dirs, 'envs': envs}
+
+    def invalidate(self):
+        with self._lock:
+            self._signature = None
+            self._conda_exe_path = None
+
+    @property
+    def conda_exe(self):
+        return self._current()['conda_exe']
+
+    def env_path(self, name):
+        """Returns the prefix of a named environment, or None if it does not exist."""
+        return self._current()['envs'].get(name)
+
+    def default_env_path(self, name):
+        """Returns where conda would create a named environment."""
+        envs_dirs = self._current()['envs_dirs']
+        return os.path.join(envs_dirs[0], name) if envs_dirs else None
+
+    def executable(self, env_name, name):
+        """Returns the path of an executable inside an environment, or None."""
+        prefix = self.env_path(env_name)
+        if not prefix:
+            return None
+        for candidate in (os.path.join(prefix, "bin", name),
+                          os.path.join(prefix, "Scripts", name + ".exe"),
+                          os.path.join(prefix, name + ".exe")):
+            if os.path.exists(candidate):
+                return candidate
+        return None
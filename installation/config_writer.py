@@ -0,0 +1,184 @@
+"""
+Edits the field defaults of lerobot's dataclass config files, such as
+config_koch_follower.py, without disturbing the rest of the file.
+The file is parsed with `ast` to find the config dataclass and the exact
+source span of each field's default, and only those spans are replaced, so
+comments, formatting and unrelated fields are kept byte for byte. Fields
+missing from the class are added after its last field.
+
+All updates for a file are applied together and written once, through a
+temporary file renamed over the original, so an interrupted save never
+leaves a half-written config. Fields that already hold the requested value
+are left untouched, and a file whose text would not change is not
+rewritten at all, so saving the same settings twice is a no-op.
+"""
+
+import ast
+import os
+import tempfile
+
+
+class ConfigWriteError(Exception):
+    """The config file could not be parsed or has no dataclass to update."""
+
+
+def format_default(value):
+    """Returns the source text of a field default; mutable values go through a default_factory."""
+    if isinstance(value, (dict, list, set)):
+        return f"field(default_factory=lambda: {value!r})"
+    return repr(value)
+
+
+def _annotation(value):
+    if value is None:
+        return "str | None"
+    if isinstance(value, dict) and value:
+        key_type = type(next(iter(value))).__name__
+        value_type = type(next(iter(value.values()))).__name__
+        return f"dict[str, {value_type}]" if key_type == "str" else "dict"
+    return type(value).__name__
+
+
+_UNKNOWN = object()
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _UNKNOWN
+
+
+def _current_default(node):
+    """The value a field default evaluates to, or _UNKNOWN if it is not a plain literal."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "field":
+        for keyword in node.keywords:
+            if keyword.arg == "default":
+                return _literal(keyword.value)
+            if keyword.arg == "default_factory" and isinstance(keyword.value, ast.Lambda):
+                return _literal(keyword.value.body)
+        return _UNKNOWN
+    return _literal(node)
+
+
+def _is_dataclass(node):
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        name = target.attr if isinstance(target, ast.Attribute) else getattr(target, "id", None)
+        if name == "dataclass":
+            return True
+    return False
+
+
+def _find_class(tree, class_name):
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and (node.name == class_name if class_name else _is_dataclass(node)):
+            return node
+    raise ConfigWriteError(f"No {'class ' + class_name if class_name else 'dataclass'} found.")
+
+
+def _imports_field(tree):
+    return any(isinstance(node, ast.ImportFrom) and node.module == "dataclasses"
+               and any(alias.name == "field" and alias.asname is None for alias in node.names)
+               for node in tree.body)
+
+
+class _Source:
+    """Converts ast (line, byte column) positions into offsets in the source text."""
+
+    def __init__(self, text):
+        self.text = text
+        self.lines = text.splitlines(keepends=True)
+        self.starts = [0]
+        for line in self.lines:
+            self.starts.append(self.starts[-1] + len(line))
+
+    def offset(self, lineno, col_offset):
+        line = self.lines[lineno - 1]
+        return self.starts[lineno - 1] + len(line.encode("utf-8")[:col_offset].decode("utf-8"))
+
+    def line_end(self, lineno):
+        return self.starts[lineno]
+
+
+def render(source, updates, class_name=None):
+    """Returns `source` with the dataclass field defaults in `updates` (field -> value) applied."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        raise ConfigWriteError(f"Cannot parse the config file: {e}") from e
+    cls = _find_class(tree, class_name)
+    text = _Source(source)
+    fields = {node.target.id: node for node in cls.body
+              if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name)}
+
+    edits = []  # (start, end, replacement)
+    appended = []
+    for name, value in updates.items():
+        default = format_default(value)
+        node = fields.get(name)
+        if node is None:
+            appended.append(f"{name}: {_annotation(value)} = {default}")
+        elif node.value is None:
+            end = text.offset(node.annotation.end_lineno, node.annotation.end_col_offset)
+            edits.append((end, end, f" = {default}"))
+        else:
+            current = _current_default(node.value)
+            if current is not _UNKNOWN and type(current) is type(value) and current == value:
+                continue
+            edits.append((text.offset(node.value.lineno, node.value.col_offset),
+                          text.offset(node.value.end_lineno, node.value.end_col_offset), default))
+
+    if appended:
+        # New fields follow the last existing field, ahead of any methods.
+        annotated = [node for node in cls.body if isinstance(node, ast.AnnAssign)]
+        last = annotated[-1] if annotated else cls.body[-1]
+        indent = " " * last.col_offset if last.lineno > cls.lineno else "    "
+        end = text.line_end(last.end_lineno)
+        newline = "" if source[:end].endswith("\n") else "\n"
+        edits.append((end, end, newline + "".join(f"{indent}{line}\n" for line in appended)))
+
+    if any("field(" in edit[2] for edit in edits) and not _imports_field(tree):
+        # Goes right after the last top-level import, or at the top of the module.
+        imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+        position = text.line_end(imports[-1].end_lineno) if imports else 0
+        edits.append((position, position, "from dataclasses import field\n"))
+
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        source = source[:start] + replacement + source[end:]
+    return source
+
+
+def write_atomic(path, text):
+    """Replaces `path` with `text` via a temporary file in the same directory, keeping its permissions."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def update_config(path, updates, class_name=None):
+    """
+    Applies every update in `updates` (field -> value) to the config
+    dataclass in `path` with a single atomic write. Returns True if the
+    file changed, False if it already held these values.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        source = f.read()
+    new_source = render(source, updates, class_name)
+    if new_source == source:
+        return False
+    write_atomic(path, new_source)
+    return True
@@ -0,0 +1,227 @@
+"""
+Minimal Dynamixel Protocol 2.0 client.
+Covers what the installer needs to find, provision and drive the X-series
+motors used by the Koch arms: ping (including broadcast ping), read,
+write, sync read and sync write. It talks to any pyserial-like object
+(`write`, `read`, `reset_input_buffer` and a settable `baudrate`), which
+lets the simulated bus in `dynamixel_sim` stand in for real hardware.
+"""
+
+import struct
+import threading
+import time
+
+HEADER = b'\xff\xff\xfd\x00'
+BROADCAST_ID = 0xFE
+MAX_ID = 252
+
+# Instructions
+PING = 0x01
+READ = 0x02
+WRITE = 0x03
+FACTORY_RESET = 0x06
+REBOOT = 0x08
+STATUS = 0x55
+SYNC_READ = 0x82
+SYNC_WRITE = 0x83
+
+# X-series control table: name -> (address, size in bytes)
+CONTROL_TABLE = {
+    'model_number': (0, 2),
+    'firmware_version': (6, 1),
+    'id': (7, 1),
+    'baud_rate': (8, 1),
+    'return_delay_time': (9, 1),
+    'operating_mode': (11, 1),
+    'torque_enable': (64, 1),
+    'present_current': (126, 2),
+    'goal_position': (116, 4),
+    'present_position': (132, 4),
+    'present_temperature': (146, 1),
+}
+
+# Registers holding two's-complement values
+SIGNED_REGISTERS = {'present_current', 'goal_position', 'present_position'}
+
+# Value of the baud_rate register -> bits per second
+BAUD_RATES = {0: 9_600, 1: 57_600, 2: 115_200, 3: 1_000_000, 4: 2_000_000, 5: 3_000_000, 6: 4_000_000}
+BAUD_INDEX = {baud: index for index, baud in BAUD_RATES.items()}
+
+# Model numbers of the motors found on Koch arms
+MODEL_NAMES = {1060: 'xl430-w250', 1190: 'xl330-m077', 1200: 'xl330-m288', 1020: 'xm430-w350'}
+
+
+def _build_crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+def crc16(data):
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]) & 0xFFFF
+    return crc
+
+
+def _stuff(body):
+    # A 0xFD is inserted after any FF FF FD in the payload so it cannot be mistaken for a header.
+    return body.replace(b'\xff\xff\xfd', b'\xff\xff\xfd\xfd')
+
+
+def _unstuff(body):
+    return body.replace(b'\xff\xff\xfd\xfd', b'\xff\xff\xfd')
+
+
+def encode_packet(motor_id, instruction, params=b''):
+    """Builds an instruction (or status) packet with byte stuffing and CRC."""
+    body = _stuff(bytes([instruction]) + bytes(params))
+    packet = HEADER + bytes([motor_id]) + struct.pack('<H', len(body) + 2) + body
+    return packet + struct.pack('<H', crc16(packet))
+
+
+def decode_packets(buffer, dropped=None):
+    """
+    Splits a byte buffer into complete packets.
+    Returns (packets, remainder) where each packet is (id, instruction,
+    params) and the remainder holds a trailing incomplete packet. Packets
+    with a bad CRC are dropped, and appended to `dropped` if it is a list.
+    """
+    packets = []
+    data = bytes(buffer)
+    while True:
+        start = data.find(HEADER)
+        if start < 0:
+            # Keep a possible partial header at the end.
+            return packets, data[-3:] if len(data) >= 3 else data
+        data = data[start:]
+        if len(data) < 7:
+            return packets, data
+        length = struct.unpack_from('<H', data, 5)[0]
+        end = 7 + length
+        if len(data) < end:
+            return packets, data
+        packet, data = data[:end], data[end:]
+        if crc16(packet[:-2]) != struct.unpack_from('<H', packet, end - 2)[0]:
+            if dropped is not None:
+                dropped.append(packet)
+            continue
+        body = _unstuff(packet[7:-2])
+        packets.append((packet[4], body[0], body[1:]))
+
+
+class StatusPacket:
+    """A motor's reply: its ID, the error byte and any returned parameters."""
+
+    def __init__(self, motor_id, error, params):
+        self.id = motor_id
+        self.error = error
+        self.params = params
+
+
+class DynamixelBus:
+    """Sends instructions on one serial port and collects the motors' replies."""
+
+    def __init__(self, serial, timeout=0.02):
+        self.serial = serial
+        self.timeout = timeout
+        # One transaction at a time; callers on different threads share the port.
+        self.lock = threading.RLock()
+        # Transactions whose replies arrived garbled, which usually means two motors share an ID.
+        self.corrupt_replies = 0
+
+    @property
+    def baudrate(self):
+        return self.serial.baudrate
+
+    @baudrate.setter
+    def baudrate(self, value):
+        with self.lock:
+            self.serial.baudrate = value
+
+    def _byte_time(self):
+        return 10.0 / self.serial.baudrate
+
+    def transact(self, motor_id, instruction, params=b'', expected=1, timeout=None):
+        """Sends one packet and returns up to `expected` status packets received before the timeout."""
+        packet = encode_packet(motor_id, instruction, params)
+        with self.lock:
+            self.serial.reset_input_buffer()
+            self.serial.write(packet)
+            if expected == 0:
+                return []
+            deadline = time.monotonic() + (timeout if timeout is not None else self.timeout) + len(packet) * self._byte_time()
+            replies = []
+            pending = b''
+            dropped = []
+            while time.monotonic() < deadline and len(replies) < expected:
+                chunk = self.serial.read(256)
+                if not chunk:
+                    continue
+                packets, pending = decode_packets(pending + chunk, dropped)
+                for reply_id, reply_instruction, reply_params in packets:
+                    if reply_instruction == STATUS and reply_params:
+                        replies.append(StatusPacket(reply_id, reply_params[0], reply_params[1:]))
+            if dropped or len(pending) > len(HEADER):
+                self.corrupt_replies += 1
+            return replies
+
+    def ping(self, motor_id):
+        """Returns (model_number, firmware_version) or None if the motor does not answer."""
+        replies = self.transact(motor_id, PING)
+        if not replies or len(replies[0].params) < 3:
+            return None
+        params = replies[0].params
+        return struct.unpack_from('<H', params)[0], params[2]
+
+    def broadcast_ping(self, max_id=MAX_ID):
+        """
+        Pings every motor at once. Motors reply in ID order, each about 3 ms
+        after the previous, so the wait is bounded by the highest ID expected.
+        Returns {id: (model_number, firmware_version)}.
+        """
+        timeout = 0.003 * (max_id + 1) + 0.016
+        found = {}
+        for reply in self.transact(BROADCAST_ID, PING, expected=max_id + 1, timeout=timeout):
+            if reply.id <= max_id and len(reply.params) >= 3:
+                found[reply.id] = (struct.unpack_from('<H', reply.params)[0], reply.params[2])
+        return found
+
+    def read(self, motor_id, register):
+        address, size = CONTROL_TABLE[register]
+        replies = self.transact(motor_id, READ, struct.pack('<HH', address, size))
+        if not replies or replies[0].error or len(replies[0].params) < size:
+            return None
+        return int.from_bytes(replies[0].params[:size], 'little', signed=register in SIGNED_REGISTERS)
+
+    def write(self, motor_id, register, value):
+        """Writes one register and returns True once the motor acknowledges it."""
+        address, size = CONTROL_TABLE[register]
+        params = struct.pack('<H', address) + int(value).to_bytes(size, 'little', signed=register in SIGNED_REGISTERS)
+        replies = self.transact(motor_id, WRITE, params)
+        return bool(replies) and replies[0].error == 0
+
+    def sync_read(self, register, motor_ids, timeout=None):
+        """Reads the same register from several motors with one packet. Returns {id: value}."""
+        address, size = CONTROL_TABLE[register]
+        params = struct.pack('<HH', address, size) + bytes(motor_ids)
+        values = {}
+        for reply in self.transact(BROADCAST_ID, SYNC_READ, params, expected=len(motor_ids), timeout=timeout):
+            if reply.error == 0 and len(reply.params) >= size:
+                values[reply.id] = int.from_bytes(reply.params[:size], 'little', signed=register in SIGNED_REGISTERS)
+        return values
+
+    def sync_write(self, register, values):
+        """Writes the same register on several motors with one packet; motors do not reply."""
+        address, size = CONTROL_TABLE[register]
+        params = struct.pack('<HH', address, size)
+        for motor_id, value in values.items():
+            params += bytes([motor_id]) + int(value).to_bytes(size, 'little', signed=register in SIGNED_REGISTERS)
+        self.transact(BROADCAST_ID, SYNC_WRITE, params, expected=0)
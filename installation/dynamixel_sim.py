@@ -0,0 +1,202 @@
+"""
+A simulated Dynamixel bus for exercising the motor tools without hardware.
+`SimulatedSerial` behaves like an open pyserial port with motors attached:
+instruction packets written to it are answered by every `SimulatedMotor`
+configured for the current baud rate, following Protocol 2.0. Two motors
+that share an ID both answer and their replies collide, as on a real bus.
+"""
+
+import struct
+import threading
+import time
+
+from installation import dynamixel
+
+# Protocol 2.0 error codes
+ERROR_INSTRUCTION = 0x02
+ERROR_DATA_LENGTH = 0x05
+ERROR_ACCESS = 0x07
+
+EEPROM_END = 64
+
+
+class SimulatedMotor:
+    """One motor's control table. Defaults match a motor straight from the factory."""
+
+    def __init__(self, motor_id=1, baudrate=57_600, model_number=1200, firmware_version=46):
+        self.table = bytearray(256)
+        self.set('model_number', model_number)
+        self.set('firmware_version', firmware_version)
+        self.set('id', motor_id)
+        self.set('baud_rate', dynamixel.BAUD_INDEX[baudrate])
+        self.set('return_delay_time', 250)
+        self.set('operating_mode', 3)
+
+    def get(self, register):
+        address, size = dynamixel.CONTROL_TABLE[register]
+        return int.from_bytes(self.table[address:address + size], 'little')
+
+    def set(self, register, value):
+        address, size = dynamixel.CONTROL_TABLE[register]
+        self.table[address:address + size] = int(value).to_bytes(size, 'little')
+
+    @property
+    def id(self):
+        return self.get('id')
+
+    @property
+    def baudrate(self):
+        return dynamixel.BAUD_RATES[self.get('baud_rate')]
+
+    def read_bytes(self, address, size):
+        return bytes(self.table[address:address + size])
+
+    def check_write(self, address, data):
+        """Returns the error code a write would fail with, or 0 if it is allowed."""
+        if address + len(data) > len(self.table):
+            return ERROR_DATA_LENGTH
+        if address < EEPROM_END and self.get('torque_enable'):
+            return ERROR_ACCESS
+        return 0
+
+    def write_bytes(self, address, data):
+        """Writes raw bytes; returns an error code, or 0 on success."""
+        error = self.check_write(address, data)
+        if error:
+            return error
+        self.table[address:address + len(data)] = data
+        goal, size = dynamixel.CONTROL_TABLE['goal_position']
+        if address <= goal < address + len(data) and self.get('torque_enable'):
+            # Motors reach their goal instantly in the simulation.
+            self.set('present_position', self.get('goal_position'))
+        return 0
+
+    def __repr__(self):
+        return f"SimulatedMotor(id={self.id}, baudrate={self.baudrate})"
+
+
+class SimulatedSerial:
+    """A pyserial-compatible port whose far end is a chain of simulated motors."""
+
+    def __init__(self, motors=(), baudrate=1_000_000, port='sim', timeout=0.001):
+        self.motors = list(motors)
+        self.baudrate = baudrate
+        self.port = port
+        self.timeout = timeout
+        self.is_open = True
+        self.packets_received = 0
+        self._output = bytearray()
+        self._pending = b''
+        self._lock = threading.Lock()
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            return len(self._output)
+
+    def reset_input_buffer(self):
+        with self._lock:
+            self._output.clear()
+
+    def read(self, size=1):
+        with self._lock:
+            data = bytes(self._output[:size])
+            del self._output[:size]
+        if not data and self.timeout:
+            time.sleep(self.timeout)
+        return data
+
+    def write(self, data):
+        packets, self._pending = dynamixel.decode_packets(self._pending + bytes(data))
+        for motor_id, instruction, params in packets:
+            self.packets_received += 1
+            replies = self._handle(motor_id, instruction, params)
+            with self._lock:
+                for reply in replies:
+                    self._output += reply
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+    def _listening(self):
+        return [motor for motor in self.motors if motor.baudrate == self.baudrate]
+
+    def _handle(self, motor_id, instruction, params):
+        motors = self._listening()
+        if instruction == dynamixel.SYNC_READ:
+            return self._sync_read(motors, params)
+        if instruction == dynamixel.SYNC_WRITE:
+            self._sync_write(motors, params)
+            return []
+
+        targets = [m for m in motors if motor_id in (m.id, dynamixel.BROADCAST_ID)]
+        replies = []
+        deferred = []
+        for motor in sorted(targets, key=lambda m: m.id):
+            if instruction == dynamixel.PING:
+                reply = struct.pack('<HB', motor.get('model_number'), motor.get('firmware_version'))
+                replies.append((motor.id, 0, reply))
+            elif instruction == dynamixel.READ and len(params) == 4:
+                address, size = struct.unpack('<HH', params)
+                replies.append((motor.id, 0, motor.read_bytes(address, size)))
+            elif instruction == dynamixel.WRITE and len(params) > 2:
+                address = struct.unpack_from('<H', params)[0]
+                error = motor.check_write(address, params[2:])
+                replies.append((motor.id, error, b''))
+                if not error:
+                    # ID and baud changes take effect after the motor has replied at its old settings.
+                    deferred.append((motor, address, params[2:]))
+            elif instruction == dynamixel.REBOOT:
+                replies.append((motor.id, 0, b''))
+            elif instruction == dynamixel.FACTORY_RESET:
+                replies.append((motor.id, 0, b''))
+                deferred.append((motor, None, None))
+            else:
+                replies.append((motor.id, ERROR_INSTRUCTION, b''))
+
+        packets = self._encode(replies) if motor_id != dynamixel.BROADCAST_ID or instruction == dynamixel.PING else []
+        for motor, address, data in deferred:
+            if address is None:
+                index = self.motors.index(motor)
+                self.motors[index] = SimulatedMotor(model_number=motor.get('model_number'))
+            else:
+                motor.write_bytes(address, data)
+        return packets
+
+    def _sync_read(self, motors, params):
+        if len(params) < 4:
+            return []
+        address, size = struct.unpack_from('<HH', params)
+        replies = []
+        for motor_id in params[4:]:
+            for motor in motors:
+                if motor.id == motor_id:
+                    replies.append((motor.id, 0, motor.read_bytes(address, size)))
+        return self._encode(replies)
+
+    def _sync_write(self, motors, params):
+        if len(params) < 4:
+            return
+        address, size = struct.unpack_from('<HH', params)
+        entries = params[4:]
+        for offset in range(0, len(entries) - size, size + 1):
+            motor_id, data = entries[offset], entries[offset + 1:offset + 1 + size]
+            for motor in motors:
+                if motor.id == motor_id:
+                    motor.write_bytes(address, data)
+
+    @staticmethod
+    def _encode(replies):
+        """Encodes status packets, dropping replies from motors that share an ID."""
+        counts = {}
+        for motor_id, _, _ in replies:
+            counts[motor_id] = counts.get(motor_id, 0) + 1
+        packets = []
+        for motor_id, error, data in replies:
+            if counts[motor_id] == 1:
+                packets.append(dynamixel.encode_packet(motor_id, dynamixel.STATUS, bytes([error]) + data))
+            else:
+                # Colliding replies garble each other; send noise so the CRC check fails.
+                packets.append(b'\xff\xff\xfd\x00' + bytes([motor_id]) + b'\x04\x00\x55\x00\x00\x00')
+        return packets
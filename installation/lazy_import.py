@@ -0,0 +1,47 @@
+"""
+Deferred imports for heavy optional dependencies.
+Flask, Pillow and lerobot are only needed by individual features, and
+lerobot is not even installed until the installer has run, so they are
+imported the first time the feature that needs them is used rather than
+when the installer starts.
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """A stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name, feature=None):
+        self._name = name
+        self._feature = feature
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except ImportError as e:
+                        needed_by = f" {self._feature} requires it." if self._feature else ""
+                        raise ImportError(f"The '{self._name}' module is not available.{needed_by} ({e})") from e
+        return self._module
+
+    @property
+    def available(self):
+        """True if the module can be imported; imports it if it has not been yet."""
+        try:
+            self._load()
+            return True
+        except ImportError:
+            return False
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
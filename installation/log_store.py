@@ -0,0 +1,131 @@
+"""
+Bounded log storage for the installer.
+Recent lines are kept in memory up to a fixed size, older lines are spilled
+to a rotating file on disk, and in-memory lines can be looked up by the
+install step that produced them and by level.
+"""
+
+import collections
+import logging
+import os
+import threading
+from logging.handlers import RotatingFileHandler
+
+
+class LogRecord:
+    """A single stored log line."""
+
+    __slots__ = ('seq', 'step', 'level', 'text')
+
+    def __init__(self, seq, step, level, text):
+        self.seq = seq
+        self.step = step
+        self.level = level
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+class LogStore:
+    """A size-capped in-memory log that spills evicted lines to disk."""
+
+    def __init__(self, spill_path, max_memory_bytes=1024 * 1024,
+                 max_file_bytes=5 * 1024 * 1024, backup_count=2):
+        self.spill_path = spill_path
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._records = {}
+        self._first_seq = 0
+        self._next_seq = 0
+        self._memory_bytes = 0
+        self._by_step = collections.defaultdict(collections.deque)
+        self._by_level = collections.defaultdict(collections.deque)
+
+        try:
+            os.makedirs(os.path.dirname(spill_path), exist_ok=True)
+            self._spill = RotatingFileHandler(spill_path, maxBytes=max_file_bytes,
+                                              backupCount=backup_count, encoding='utf-8', delay=True)
+            self._spill.setFormatter(logging.Formatter('%(message)s'))
+        except OSError:
+            # Without a writable spill file, evicted lines are simply dropped.
+            self._spill = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._records.values()))
+
+    def append(self, message, step=None, level='info'):
+        """Stores each line of a message, evicting the oldest lines if over the size limit."""
+        with self._lock:
+            for text in str(message).splitlines() or ['']:
+                record = LogRecord(self._next_seq, step, level, text)
+                self._records[record.seq] = record
+                self._by_step[step].append(record.seq)
+                self._by_level[level].append(record.seq)
+                self._memory_bytes += len(text) + 1
+                self._next_seq += 1
+            while self._memory_bytes > self.max_memory_bytes and len(self._records) > 1:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        record = self._records.pop(self._first_seq)
+        self._first_seq += 1
+        self._memory_bytes -= len(record.text) + 1
+        # Lines are evicted in insertion order, so they are always at the front of their index.
+        self._by_step[record.step].popleft()
+        self._by_level[record.level].popleft()
+        if not self._by_step[record.step]:
+            del self._by_step[record.step]
+        if not self._by_level[record.level]:
+            del self._by_level[record.level]
+        self._write_spill(record)
+
+    def _write_spill(self, record):
+        if self._spill is None:
+            return
+        step = record.step or '-'
+        line = f"{record.seq}\t{record.level}\t{step}\t{record.text}"
+        self._spill.handle(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO}))
+
+    def lines(self, step=None, level=None):
+        """Returns the in-memory records for a step and/or level, oldest first."""
+        with self._lock:
+            if step is None and level is None:
+                return list(self._records.values())
+            candidates = []
+            if step is not None:
+                candidates.append(self._by_step.get(step, ()))
+            if level is not None:
+                candidates.append(self._by_level.get(level, ()))
+            smallest = min(candidates, key=len)
+            return [record for record in (self._records[seq] for seq in smallest)
+                    if (step is None or record.step == step) and (level is None or record.level == level)]
+
+    def steps(self):
+        with self._lock:
+            return [step for step in self._by_step if step is not None]
+
+    def _spill_all(self):
+        # Evicting everything writes the remaining lines to disk, oldest first.
+        while self._records:
+            self._evict_oldest()
+        self._first_seq = self._next_seq
+
+    def clear(self):
+        """Spills all in-memory lines, then starts a fresh spill file, keeping the old one as a backup."""
+        with self._lock:
+            self._spill_all()
+            if self._spill is not None and os.path.exists(self.spill_path):
+                self._spill.doRollover()
+
+    def close(self):
+        """Spills the in-memory lines so the file holds the whole session, then closes it."""
+        with self._lock:
+            self._spill_all()
+            if self._spill is not None:
+                self._spill.close()
@@ -0,0 +1,150 @@
+"""
+Batch ID and baud rate assignment for an arm's motors.
+The provisioner compares what is on the bus with the arm's motor table and
+fixes every motor it can address in one pass: motors already at their
+final ID and baud rate are left alone, and any other motor with a unique ID
+is given the ID of the next unassigned table entry and moved to the target
+baud rate. Factory-default motors all answer as ID 1, so when several are
+connected only one can be addressed at a time; the session then keeps
+polling the bus and configures each newly connected motor as soon as it
+appears, without any button presses in between. If two such motors are
+connected at once their replies collide; garbled replies, or a motor that
+stops answering right after being configured, are reported as a likely
+collision so the user can be told to connect one motor at a time.
+"""
+
+import threading
+import time
+
+from installation import dynamixel
+from installation.bus_scanner import SUPPORTED_BAUDRATES, scan_bus
+
+
+class MotorSpec:
+    """One entry of an arm's motor table."""
+
+    def __init__(self, name, motor_id, model=None):
+        self.name = name
+        self.id = motor_id
+        self.model = model
+
+    def accepts(self, motor):
+        """True if a found motor is the right model for this entry."""
+        found = dynamixel.MODEL_NAMES.get(motor.model_number)
+        return self.model is None or found is None or found == self.model
+
+    def __repr__(self):
+        return f"MotorSpec({self.name!r}, id={self.id}, model={self.model!r})"
+
+
+def motor_table(config):
+    """Builds the motor table from a lerobot arm config such as KochFollowerConfig."""
+    return [MotorSpec(name, motor.id, getattr(motor, 'model', None)) for name, motor in config.motors.items()]
+
+
+class ProvisionResult:
+    def __init__(self, configured, assigned, missing):
+        self.configured = configured
+        self.assigned = assigned
+        self.missing = missing
+
+    @property
+    def complete(self):
+        return not self.missing
+
+
+class MotorProvisioner:
+    """Assigns IDs and the target baud rate to the motors of one arm over a shared bus."""
+
+    def __init__(self, bus, table, baudrate=1_000_000, baudrates=SUPPORTED_BAUDRATES,
+                 max_id=None, on_progress=None):
+        self.bus = bus
+        self.table = list(table)
+        self.baudrate = baudrate
+        # The target rate is scanned first so configured motors are recognised immediately.
+        self.baudrates = (baudrate,) + tuple(b for b in baudrates if b != baudrate)
+        # None scans the full ID range whenever a motor is missing from the quick window.
+        self.max_id = None if max_id is None else max(max_id, max((spec.id for spec in self.table), default=0))
+        self.on_progress = on_progress or (lambda message: None)
+        self.assigned = []
+        # Set by each pass when replies were garbled or a configured motor went silent.
+        self.collision_suspected = False
+
+    def _configured(self, inventory):
+        """Names of table entries already present at their ID and the target baud rate."""
+        at_target = {m.id: m for m in inventory if m.baudrate == self.baudrate}
+        return {spec.name for spec in self.table if spec.id in at_target and spec.accepts(at_target[spec.id])}
+
+    def provision_once(self):
+        """Scans the bus, configures every addressable motor and returns the names still missing."""
+        corrupt_before = self.bus.corrupt_replies
+        self._lost_motor = False
+        inventory = scan_bus(self.bus, self.baudrates, self.max_id, expected=len(self.table))
+        configured = self._configured(inventory)
+        pending = [spec for spec in self.table if spec.name not in configured]
+        table_ids = {spec.id for spec in self.table}
+        candidates = [m for m in inventory
+                      if m.baudrate != self.baudrate or m.id not in table_ids]
+
+        for spec in list(pending):
+            motor = next((m for m in candidates if spec.accepts(m)), None)
+            if motor is None:
+                continue
+            if self._assign(motor, spec, inventory):
+                candidates.remove(motor)
+                pending.remove(spec)
+                inventory.remove(motor)
+        self.collision_suspected = bool(pending) and (self.bus.corrupt_replies > corrupt_before or self._lost_motor)
+        return [spec.name for spec in pending]
+
+    def _assign(self, motor, spec, inventory):
+        """Moves one motor to the spec's ID and the target baud rate, then verifies it."""
+        busy = {m.id for m in inventory if m.baudrate == motor.baudrate and m is not motor}
+        if spec.id != motor.id and spec.id in busy:
+            # Another motor at this rate already uses the ID; it will move first on a later pass.
+            return False
+        with self.bus.lock:
+            self.bus.baudrate = motor.baudrate
+            # EEPROM registers (ID, baud rate) can only be written with torque off.
+            self.bus.write(motor.id, 'torque_enable', 0)
+            if spec.id != motor.id and not self.bus.write(motor.id, 'id', spec.id):
+                self.on_progress(f"Could not set the ID of the motor for '{spec.name}'.")
+                return False
+            if motor.baudrate != self.baudrate:
+                # The motor switches rate as soon as it has replied, so the acknowledgement is not checked.
+                self.bus.write(spec.id, 'baud_rate', dynamixel.BAUD_INDEX[self.baudrate])
+            self.bus.baudrate = self.baudrate
+            verified = self.bus.ping(spec.id) is not None
+        if verified:
+            self.assigned.append(spec.name)
+            self.on_progress(f"'{spec.name}' motor set to ID {spec.id} at {self.baudrate} baud.")
+        else:
+            self._lost_motor = True
+            self.on_progress(f"The motor for '{spec.name}' did not answer after being configured.")
+        return verified
+
+    def run(self, poll_interval=0.1, timeout=None, stop_event=None, on_waiting=None, on_collision=None):
+        """
+        Provisions until every table entry is configured, the timeout passes
+        or `stop_event` is set. `on_waiting(names)` is called whenever the
+        remaining motors cannot be reached, i.e. the user needs to connect
+        the next one, and `on_collision(names)` instead when several motors
+        seem to be answering on the same ID.
+        """
+        stop_event = stop_event or threading.Event()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        waiting_for = None
+        while True:
+            missing = self.provision_once()
+            if not missing or stop_event.is_set() or (deadline and time.monotonic() >= deadline):
+                break
+            state = (missing, self.collision_suspected)
+            if state != waiting_for:
+                if self.collision_suspected and on_collision:
+                    on_collision(missing)
+                elif on_waiting:
+                    on_waiting(missing)
+            waiting_for = state
+            stop_event.wait(poll_interval)
+        configured = [spec.name for spec in self.table if spec.name not in missing]
+        return ProvisionResult(configured, list(self.assigned), missing)
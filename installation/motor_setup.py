@@ -0,0 +1,130 @@
+"""
+In-process motor setup for both arms.
+The installer keeps one open connection per arm port and runs the scan
+and provisioning on a worker thread, reporting back through a single
+`on_event(kind, role, value)` callback that the caller hands to its own
+event queue. Nothing here touches Tk.
+
+Event kinds:
+    'inventory'  value is the list of MotorInfo found (or the scan error)
+    'progress'   value is a message from the provisioner
+    'waiting'    value is the list of motor names still to be connected
+    'collision'  value is the same list, when motors seem to share an ID
+    'arm_done'   value is the arm's ProvisionResult
+    'error'      value is the exception that stopped the arm's setup
+    'finished'   role is None, value maps each role to its ProvisionResult
+"""
+
+import threading
+
+from installation import bus_scanner
+from installation.dynamixel import DynamixelBus
+from installation.lazy_import import LazyModule
+from installation.motor_provisioner import MotorProvisioner, MotorSpec, motor_table
+
+koch_follower = LazyModule("lerobot.common.robots.koch_follower", "Reading the follower's motor table")
+koch_leader = LazyModule("lerobot.common.teleoperators.koch_leader", "Reading the leader's motor table")
+
+# The Koch arms' motor tables, used when lerobot cannot be imported into the installer's interpreter.
+DEFAULT_MOTOR_TABLES = {
+    'follower': [
+        MotorSpec('shoulder_pan', 1, 'xl430-w250'),
+        MotorSpec('shoulder_lift', 2, 'xl430-w250'),
+        MotorSpec('elbow_flex', 3, 'xl330-m288'),
+        MotorSpec('wrist_flex', 4, 'xl330-m288'),
+        MotorSpec('wrist_roll', 5, 'xl330-m288'),
+        MotorSpec('gripper', 6, 'xl330-m288'),
+    ],
+    'leader': [
+        MotorSpec('shoulder_pan', 1, 'xl330-m077'),
+        MotorSpec('shoulder_lift', 2, 'xl330-m077'),
+        MotorSpec('elbow_flex', 3, 'xl330-m077'),
+        MotorSpec('wrist_flex', 4, 'xl330-m077'),
+        MotorSpec('wrist_roll', 5, 'xl330-m077'),
+        MotorSpec('gripper', 6, 'xl330-m077'),
+    ],
+}
+
+
+def arm_motor_table(role):
+    """Returns the motor table for 'follower' or 'leader', from lerobot's config when available."""
+    try:
+        if role == 'follower':
+            return motor_table(koch_follower.KochFollowerConfig())
+        return motor_table(koch_leader.KochLeaderConfig())
+    except Exception:
+        return list(DEFAULT_MOTOR_TABLES[role])
+
+
+class MotorSetupService:
+    """Owns the arms' bus connections and runs motor setup off the UI thread."""
+
+    def __init__(self, open_serial=bus_scanner.open_serial, motor_tables=None):
+        self.open_serial = open_serial
+        self.motor_tables = motor_tables or {}
+        self._buses = {}
+        self._lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def bus(self, port):
+        """Returns the shared connection for a port, opening it on first use."""
+        with self._lock:
+            if port not in self._buses:
+                self._buses[port] = DynamixelBus(self.open_serial(port))
+            return self._buses[port]
+
+    def close(self):
+        with self._lock:
+            buses, self._buses = self._buses, {}
+        for bus in buses.values():
+            bus.serial.close()
+
+    def start(self, ports, on_event):
+        """
+        Scans every arm in `ports` (role -> port) in parallel, then provisions
+        them one after another on a worker thread. Returns the thread.
+        """
+        if self.running:
+            raise RuntimeError("Motor setup is already running.")
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(dict(ports), on_event, self.stop_event), daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self, ports, on_event, stop_event):
+        buses = {}
+        for role, port in ports.items():
+            try:
+                buses[role] = self.bus(port)
+            except Exception as e:
+                on_event('error', role, e)
+
+        tables = {role: self.motor_tables.get(role) or arm_motor_table(role) for role in buses}
+        expected = {role: len(table) for role, table in tables.items()}
+        for role, motors in bus_scanner.scan_buses(buses, expected=expected).items():
+            on_event('inventory', role, motors)
+
+        results = {}
+        for role, bus in buses.items():
+            if stop_event.is_set():
+                break
+            table = tables[role]
+            provisioner = MotorProvisioner(bus, table, on_progress=lambda message, role=role: on_event('progress', role, message))
+            try:
+                results[role] = provisioner.run(
+                    stop_event=stop_event,
+                    on_waiting=lambda missing, role=role: on_event('waiting', role, missing),
+                    on_collision=lambda missing, role=role: on_event('collision', role, missing))
+            except Exception as e:
+                on_event('error', role, e)
+                continue
+            on_event('arm_done', role, results[role])
+        on_event('finished', None, results)
@@ -0,0 +1,148 @@
+"""
+Local package cache shared by every install on a machine (or a network share).
+Holds a pip wheelhouse and a conda package directory, plus a manifest that
+maps a hash of each install request to the wheels it needs, so a repeated
+request can be satisfied offline. The wheels a request needs are taken
+from a pip installation report (`pip install --dry-run --report`), since
+the wheelhouse is shared and also holds other requests' wheels.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import unquote, urlsplit
+from urllib.request import url2pathname
+
+
+def cache_key(*parts):
+    """Hashes the inputs of an install request into a manifest key."""
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PackageCache:
+    """A wheelhouse and conda pkgs directory with a request manifest."""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root):
+        self.root = root
+        self.wheelhouse = os.path.join(root, "wheels")
+        self.conda_pkgs = os.path.join(root, "conda-pkgs")
+        self.manifest_path = os.path.join(root, self.MANIFEST)
+        self._lock = threading.Lock()
+        os.makedirs(self.wheelhouse, exist_ok=True)
+        os.makedirs(self.conda_pkgs, exist_ok=True)
+        self._manifest = self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault('files', {})
+        data.setdefault('requests', {})
+        return data
+
+    def _save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_warm(self, key):
+        """True if a request was completed before and every wheel it used is still intact."""
+        with self._lock:
+            names = self._manifest['requests'].get(key)
+            if names is None:
+                return False
+            for name in names:
+                path = os.path.join(self.wheelhouse, name)
+                expected = self._manifest['files'].get(name)
+                if not expected or not os.path.exists(path) or os.path.getsize(path) != expected['size']:
+                    return False
+            return True
+
+    def report_wheels(self, report_path):
+        """
+        Returns the wheelhouse files a pip installation report installs from,
+        or None if the report cannot be read.
+        """
+        try:
+            with open(report_path, 'r') as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return None
+        wheelhouse = os.path.realpath(self.wheelhouse)
+        names = set()
+        for item in report.get('install', []):
+            parts = urlsplit(item.get('download_info', {}).get('url', ''))
+            if parts.scheme != 'file':
+                continue
+            path = os.path.realpath(url2pathname(unquote(parts.path)))
+            if os.path.dirname(path) == wheelhouse:
+                names.add(os.path.basename(path))
+        return sorted(names)
+
+    def record(self, key, wheels=()):
+        """
+        Marks a request as cached, together with the wheelhouse files it
+        needs. Wheel files never change once written, so each one is only
+        hashed the first time it is seen.
+        """
+        with self._lock:
+            names = []
+            for name in wheels:
+                path = os.path.join(self.wheelhouse, name)
+                if not os.path.exists(path):
+                    continue
+                if name not in self._manifest['files']:
+                    self._manifest['files'][name] = {'sha256': file_digest(path), 'size': os.path.getsize(path)}
+                names.append(name)
+            self._manifest['requests'][key] = names
+            self._save()
+
+    def merge(self, manifest_path):
+        """Adds the file and request entries of another cache's manifest, e.g. from a bundle."""
+        try:
+            with open(manifest_path, 'r') as f:
+                other = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for name, entry in other.get('files', {}).items():
+                self._manifest['files'].setdefault(name, entry)
+            for key, names in other.get('requests', {}).items():
+                self._manifest['requests'].setdefault(key, names)
+            self._save()
+
+    def verify(self, key=None):
+        """
+        Re-hashes the wheels a request uses (every cached wheel without a
+        key) and returns the names of corrupted or missing ones.
+        """
+        with self._lock:
+            bad = []
+            names = self._manifest['requests'].get(key, []) if key is not None else list(self._manifest['files'])
+            for name in names:
+                expected = self._manifest['files'].get(name)
+                if expected is None:
+                    bad.append(name)
+                    continue
+                path = os.path.join(self.wheelhouse, name)
+                if not os.path.exists(path) or file_digest(path) != expected['sha256']:
+                    bad.append(name)
+            return bad
+
+    def conda_env(self):
+        """Environment variables that point conda at the shared package directory."""
+        return {"CONDA_PKGS_DIRS": self.conda_pkgs}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Hardware identity for robot arm ports.
+Device paths such as /dev/ttyACM0 change between reboots, so each arm is
+remembered by its USB adapter's VID/PID and serial number (or its physical
+USB location when the adapter has no serial number). All remembered arms
+are resolved to their current device paths with a single pyserial scan.
+
+Run directly to print the current ports, e.g. from fleet scripts:
+    python -m installation.port_identity
+"""
+
+import json
+import os
+import sys
+
+DEFAULT_STORE = os.path.join(os.path.expanduser("~/.lerobot_installer"), "arm_ports.json")
+BY_ID_DIR = "/dev/serial/by-id"
+
+
+class PortIdentity:
+    """The USB attributes that identify one arm's serial adapter."""
+
+    def __init__(self, vid, pid, serial_number=None, location=None, description=None):
+        self.vid = vid
+        self.pid = pid
+        self.serial_number = serial_number
+        self.location = location
+        self.description = description
+
+    @classmethod
+    def from_port_info(cls, info):
+        return cls(info.vid, info.pid, info.serial_number, info.location, info.description)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['vid'], data['pid'], data.get('serial_number'), data.get('location'), data.get('description'))
+
+    def to_dict(self):
+        return {'vid': self.vid, 'pid': self.pid, 'serial_number': self.serial_number,
+                'location': self.location, 'description': self.description}
+
+    def matches(self, info):
+        """True if a pyserial port belongs to this adapter."""
+        if info.vid != self.vid or info.pid != self.pid:
+            return False
+        if self.serial_number:
+            return info.serial_number == self.serial_number
+        # Without a serial number, the physical USB port is the only stable attribute.
+        return bool(self.location) and info.location == self.location
+
+    def __repr__(self):
+        ident = self.serial_number or f"@{self.location}"
+        return f"PortIdentity({self.vid:04x}:{self.pid:04x} {ident})"
+
+
+def scan_ports():
+    """Returns pyserial's info for every connected USB-serial adapter, keyed by device path."""
+    from serial.tools import list_ports
+    return {info.device: info for info in list_ports.comports() if info.vid is not None}
+
+
+def resolve(identities, ports=None):
+    """Maps each role (e.g. 'follower') to its current device path, or None if not connected."""
+    ports = scan_ports() if ports is None else ports
+    resolved = {}
+    for role, identity in identities.items():
+        matches = [device for device, info in ports.items() if identity.matches(info)]
+        resolved[role] = matches[0] if len(matches) == 1 else None
+    return resolved
+
+
+def stable_path(device):
+    """Returns the /dev/serial/by-id link for a device, which survives reboots, if there is one."""
+    if not os.path.isdir(BY_ID_DIR):
+        return None
+    target = os.path.realpath(device)
+    for name in sorted(os.listdir(BY_ID_DIR)):
+        link = os.path.join(BY_ID_DIR, name)
+        if os.path.realpath(link) == target:
+            return link
+    return None
+
+
+class PortIdentityStore:
+    """Remembers the adapter identity of each arm in a small JSON file."""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return {role: PortIdentity.from_dict(entry) for role, entry in data.items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def save(self, role, identity):
+        identities = self.load()
+        identities[role] = identity
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({name: ident.to_dict() for name, ident in identities.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def resolve(self, ports=None):
+        """Resolves every remembered arm in one scan; returns role -> device path or None."""
+        identities = self.load()
+        return resolve(identities, ports) if identities else {}
+
+
+def main():
+    resolved = PortIdentityStore().resolve()
+    if not resolved:
+        print("No arms have been identified yet. Run port discovery in the installer first.")
+        return 1
+    for role, device in sorted(resolved.items()):
+        print(f"{role}: {device or 'not connected'}")
+    return 0 if all(resolved.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
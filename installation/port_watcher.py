@@ -0,0 +1,156 @@
+"""
+USB-serial hotplug detection for port discovery.
+Device add/remove events come from udev on Linux when pyudev is installed,
+and otherwise from polling pyserial's port list. Only USB-serial adapters
+are considered, so virtual consoles and built-in serial ports never show
+up as changes.
+"""
+
+import threading
+
+
+class DeviceEvent:
+    """A serial device being plugged in ('add') or unplugged ('remove')."""
+
+    def __init__(self, action, device):
+        self.action = action
+        self.device = device
+
+    def __repr__(self):
+        return f"DeviceEvent({self.action!r}, {self.device!r})"
+
+
+def list_usb_serial_ports():
+    """Returns the device paths of all connected USB-serial adapters."""
+    from serial.tools import list_ports
+    # Only USB devices report a vendor ID; built-in UARTs and consoles do not.
+    return {port.device for port in list_ports.comports() if port.vid is not None}
+
+
+class PollingEventSource:
+    """Emits events by diffing pyserial's USB-serial port list at a short interval."""
+
+    def __init__(self, interval=0.2, list_ports=list_usb_serial_ports):
+        self.interval = interval
+        self.list_ports = list_ports
+        self._stop = threading.Event()
+
+    def start(self, callback):
+        # A fresh event per run, so a poller still sleeping from an earlier run cannot resume.
+        stop = self._stop = threading.Event()
+        known = self.list_ports()
+
+        def poll():
+            nonlocal known
+            while not stop.wait(self.interval):
+                try:
+                    current = self.list_ports()
+                except Exception:
+                    continue
+                for device in sorted(known - current):
+                    callback(DeviceEvent('remove', device))
+                for device in sorted(current - known):
+                    callback(DeviceEvent('add', device))
+                known = current
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class UdevEventSource:
+    """Emits events from the kernel's udev notifications for USB tty devices."""
+
+    def __init__(self):
+        import pyudev
+        self._context = pyudev.Context()
+        self._monitor = pyudev.Monitor.from_netlink(self._context)
+        self._monitor.filter_by('tty')
+        self._observer = None
+        self._pyudev = pyudev
+
+    def start(self, callback):
+        def handle(device):
+            if device.action not in ('add', 'remove') or not device.device_node:
+                return
+            # Remove events carry the properties recorded at add time, so this works for both.
+            if device.get('ID_BUS') != 'usb':
+                return
+            callback(DeviceEvent(device.action, device.device_node))
+
+        self._observer = self._pyudev.MonitorObserver(self._monitor, callback=handle, daemon=True)
+        self._observer.start()
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.send_stop()
+
+
+class ManualEventSource:
+    """An event source driven by calling `emit`, for tests and simulated hardware."""
+
+    def __init__(self):
+        self._callback = None
+
+    def start(self, callback):
+        self._callback = callback
+
+    def stop(self):
+        self._callback = None
+
+    def emit(self, action, device):
+        if self._callback:
+            self._callback(DeviceEvent(action, device))
+
+
+def default_event_source():
+    """Prefers udev notifications and falls back to polling pyserial."""
+    try:
+        return UdevEventSource()
+    except Exception:
+        return PollingEventSource()
+
+
+class PortWatcher:
+    """Tracks connected USB-serial ports and reports hotplug events as they happen."""
+
+    def __init__(self, source=None, list_ports=list_usb_serial_ports):
+        self.source = source
+        self.list_ports = list_ports
+        self.ports = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.running = False
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def start(self):
+        """Takes a snapshot of the connected ports and starts listening for changes."""
+        if self.running:
+            return
+        if self.source is None:
+            self.source = default_event_source()
+        with self._lock:
+            self.ports = set(self.list_ports())
+        self.source.start(self._on_event)
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.source.stop()
+            self.running = False
+
+    def snapshot(self):
+        with self._lock:
+            return set(self.ports)
+
+    def _on_event(self, event):
+        with self._lock:
+            if event.action == 'remove':
+                self.ports.discard(event.device)
+            elif event.action == 'add':
+                self.ports.add(event.device)
+        for listener in list(self._listeners):
+            listener(event)
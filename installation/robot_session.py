@@ -0,0 +1,132 @@
+"""
+Teleoperation and telemetry for a follower/leader pair.
+A RobotSession is what the test server talks to. The installer builds one
+on the buses opened during motor setup; headless runs (CI, benchmarks) build
+one on real ports or on simulated buses, without Tk.
+"""
+
+import math
+import threading
+import time
+
+from installation.dynamixel import DynamixelBus
+from installation.dynamixel_sim import SimulatedMotor, SimulatedSerial
+from installation.motor_setup import DEFAULT_MOTOR_TABLES
+from installation.teleop import CALIBRATION_DIR, JointCalibration, TeleopEngine, load_calibration
+from installation.telemetry import TelemetryHub
+
+ROLES = ('follower', 'leader')
+
+
+def print_log(message, level='info'):
+    print(message if level == 'info' else f"[{level}] {message}")
+
+
+def _sweep_motors(motors, stop, period=0.02):
+    """Moves simulated motors back and forth, as if someone were moving the arm by hand."""
+    started = time.monotonic()
+    while not stop.wait(period):
+        phase = 2 * math.pi * (time.monotonic() - started) / 4.0
+        for i, motor in enumerate(motors):
+            motor.set('present_position', 2048 + round(600 * math.sin(phase + i)))
+
+
+class RobotSession:
+    """
+    `get_bus(role)` returns the DynamixelBus for 'follower' or 'leader', or
+    None if that arm is not connected, and `get_motor_ids(role)` returns the
+    arm's motor IDs. `get_calibration(role)` returns the arm's motor ID ->
+    JointCalibration, or None if it has not been calibrated. All are called
+    lazily, so a session can exist before the arms are connected.
+    """
+
+    def __init__(self, get_bus, get_motor_ids, log=print_log, teleop_rate_hz=200, get_calibration=load_calibration):
+        self.get_bus = get_bus
+        self.get_motor_ids = get_motor_ids
+        self.get_calibration = get_calibration
+        self.log = log
+        self.teleop_rate_hz = teleop_rate_hz
+        self.teleop = None
+        self.telemetry = TelemetryHub(self.sample_telemetry)
+        self._simulation_stop = threading.Event()
+
+    @classmethod
+    def simulated(cls, log=print_log, teleop_rate_hz=200, move_leader=False):
+        """
+        A session on simulated six-motor arms, for running without hardware.
+        With `move_leader` the leader's joints sweep continuously, so
+        telemetry and teleoperation see changing positions.
+        """
+        buses = {}
+        motor_ids = {}
+        calibrations = {}
+        sim_motors = {}
+        for role in ROLES:
+            table = DEFAULT_MOTOR_TABLES[role]
+            model = 1190 if role == 'leader' else 1200
+            motors = [SimulatedMotor(spec.id, 1_000_000, model) for spec in table]
+            for motor in motors:
+                motor.set('present_position', 2048)
+                motor.set('present_temperature', 30)
+            buses[role] = DynamixelBus(SimulatedSerial(motors))
+            sim_motors[role] = motors
+            motor_ids[role] = [spec.id for spec in table]
+            calibrations[role] = {spec.id: JointCalibration(0, 4095) for spec in table}
+        session = cls(buses.__getitem__, motor_ids.__getitem__, log=log, teleop_rate_hz=teleop_rate_hz,
+                      get_calibration=calibrations.__getitem__)
+        if move_leader:
+            threading.Thread(target=_sweep_motors, args=(sim_motors['leader'], session._simulation_stop), daemon=True).start()
+        return session
+
+    def get_teleop_engine(self):
+        """Creates the teleoperation engine on first use."""
+        if self.teleop is None:
+            leader, follower = self.get_bus('leader'), self.get_bus('follower')
+            if leader is None or follower is None:
+                raise RuntimeError("Both arms must be connected for teleoperation.")
+            calibration = {role: self.get_calibration(role) for role in ROLES}
+            uncalibrated = [role for role in ROLES if not calibration[role]]
+            if uncalibrated:
+                arms = f"{' and '.join(uncalibrated)} arm{'s' if len(uncalibrated) > 1 else ''}"
+                raise RuntimeError(f"Calibrate the {arms} with lerobot first "
+                                   f"(no calibration found under {CALIBRATION_DIR}).")
+            self.teleop = TeleopEngine(leader, follower, self.get_motor_ids('leader'),
+                                       calibration['leader'], calibration['follower'],
+                                       rate_hz=self.teleop_rate_hz, follower_ids=self.get_motor_ids('follower'))
+        return self.teleop
+
+    def handle_chat_command(self, message):
+        """Answers the test page's chat box: 'start', 'stop' or 'status' control teleoperation."""
+        command = message.strip().lower()
+        try:
+            if command == 'start':
+                self.get_teleop_engine().start()
+                return f"Teleoperation started at {self.teleop_rate_hz} Hz. Move the leader arm."
+            if command == 'stop':
+                if self.teleop is not None:
+                    self.teleop.stop()
+                return "Teleoperation stopped."
+        except Exception as e:
+            self.log(f"Teleoperation error: {e}", level='error')
+            return f"Teleoperation error: {e}"
+        if self.teleop is None or not self.teleop.running:
+            return "Teleoperation is not running. Send 'start' to begin."
+        stats = self.teleop.stats.snapshot()
+        return (f"Running at {stats['actual_hz']} Hz, jitter p99 {stats['jitter_ms']['p99']} ms, "
+                f"{stats['overruns']} overruns in {stats['ticks']} ticks.")
+
+    def sample_telemetry(self):
+        """Reads every joint's position, current and temperature from both arms."""
+        state = {}
+        for role in ROLES:
+            bus = self.get_bus(role)
+            if bus is None:
+                continue
+            ids = self.get_motor_ids(role)
+            state[role] = {name: bus.sync_read(f'present_{name}', ids) for name in ('position', 'current', 'temperature')}
+        return state
+
+    def stop(self):
+        self._simulation_stop.set()
+        if self.teleop is not None and self.teleop.running:
+            self.teleop.stop()
@@ -3,21 +3,27 @@ import tkinter as tk
 from tkinter import messagebox
 import argparse
 import threading
-import time
 import sys
+import os
 from tkinter import font
 
 # Since this is a standalone script, we need to add lerobot to the path
 # to import its components. This assumes the script is run from the project root.
 try:
-    from lerobot.common.robots import make_robot_from_config, RobotConfig, koch_follower
-    from lerobot.common.teleoperators import make_teleoperator_from_config, TeleoperatorConfig, koch_leader
+    from lerobot.common.robots import koch_follower
+    from lerobot.common.teleoperators import koch_leader
 except ImportError:
     # Simple fallback for direct execution
     import sys, os
     sys.path.append(os.getcwd())
-    from lerobot.common.robots import make_robot_from_config, RobotConfig, koch_follower
-    from lerobot.common.teleoperators import make_teleoperator_from_config, TeleoperatorConfig, koch_leader
+    from lerobot.common.robots import koch_follower
+    from lerobot.common.teleoperators import koch_leader
+
+# The motor tools live next to this script in the installer's 'installation' package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from installation import bus_scanner
+from installation.dynamixel import DynamixelBus
+from installation.motor_provisioner import MotorProvisioner, motor_table
 
 
 class MotorSetupApp:
@@ -30,17 +36,11 @@ class MotorSetupApp:
         
         if self.device_name == "follower":
             cfg = koch_follower.KochFollowerConfig()
-            self.motor_names = list(cfg.motors.keys())
-            self.config_class = RobotConfig
-            self.make_func = make_robot_from_config
         else:
             cfg = koch_leader.KochLeaderConfig()
-            self.motor_names = list(cfg.motors.keys())
-            self.config_class = TeleoperatorConfig
-            self.make_func = make_teleoperator_from_config
+        self.motor_names = list(cfg.motors.keys())
             
-        self.current_motor_index = -1
-        
+        self.cfg = cfg
         self.setup_fonts()
         self.setup_ui()
         self.root.after(200, self.next_step) 
@@ -74,54 +74,55 @@ class MotorSetupApp:
         self.action_button.pack(pady=20)
 
     def next_step(self):
-        self.current_motor_index += 1
-        if self.current_motor_index < len(self.motor_names):
-            motor_name = self.motor_names[self.current_motor_index]
-            self.main_label.config(text=f"Connect the controller board to the '{motor_name}' motor ONLY.")
-            self.status_label.config(text="Ensure no other motors are connected, then press Continue.", fg=self.colors['text_secondary'])
-            self.action_button.config(text="Continue", command=self.setup_current_motor, state="normal")
+        """Starts a provisioning session; motors are configured as they are connected."""
+        self.main_label.config(text=f"Connect the {self.device_name}'s motors one at a time, starting with '{self.motor_names[0]}'.", fg=self.colors['text_primary'])
+        self.status_label.config(text="Each motor is configured as soon as it is detected.", fg=self.colors['text_secondary'])
+        self.stop_event = threading.Event()
+        self.action_button.config(text="Stop", state="normal", command=self.stop_event.set)
+        threading.Thread(target=self._provision_motors, daemon=True).start()
+
+    def _provision_motors(self):
+        try:
+            serial = bus_scanner.open_serial(self.port)
+        except Exception as e:
+            self.root.after(0, self.report_result, False, str(e))
+            return
+        try:
+            provisioner = MotorProvisioner(
+                DynamixelBus(serial), motor_table(self.cfg),
+                on_progress=lambda message: self.root.after(0, self.show_progress, message))
+            result = provisioner.run(
+                stop_event=self.stop_event,
+                on_waiting=lambda missing: self.root.after(0, self.show_waiting, missing),
+                on_collision=lambda missing: self.root.after(0, self.show_collision, missing))
+        except Exception as e:
+            self.root.after(0, self.report_result, False, str(e))
+            return
+        finally:
+            serial.close()
+        if result.complete:
+            self.root.after(0, self.report_result, True, f"All motors for the {self.device_name} have been configured.")
         else:
-            self.main_label.config(text="Setup Complete!", fg=self.colors['success'])
-            self.status_label.config(text=f"All motors for the {self.device_name} have been configured.")
-            self.action_button.config(text="Finish", command=self.root.quit)
+            self.root.after(0, self.report_result, False, f"Not configured: {', '.join(result.missing)}")
 
-    def setup_current_motor(self):
-        motor_name = self.motor_names[self.current_motor_index]
-        self.action_button.config(state="disabled", text="Configuring...")
-        self.status_label.config(text=f"Setting ID for '{motor_name}' motor...")
-        
-        # # This is where the actual hardware interaction would happen.
-        # # Since the library uses a blocking `input()`, we simulate the logic here.
-        # threading.Thread(target=self._simulate_motor_setup, args=(motor_name,), daemon=True).start()
+    def show_waiting(self, missing):
+        self.main_label.config(text=f"Connect the controller board to the '{missing[0]}' motor ONLY.", fg=self.colors['text_primary'])
 
-    def _simulate_motor_setup(self, motor_name):
-        try:
-            # In a real implementation, you would need a non-interactive function here, e.g.:
-            # cfg = self.config_class(type=self.device_type, port=self.port)
-            # device = self.make_func(cfg)
-            # device.setup_single_motor(motor_name) 
-            
-            # Simulating the work
-            time.sleep(1.5)
-            
-            # Getting the expected ID for the message
-            cfg_for_id = self.config_class(type=self.device_type)
-            motor_id = cfg_for_id.motors[motor_name].id
-            
-            message = f"'{motor_name}' motor ID set to {motor_id}"
-            self.root.after(0, self.report_result, motor_name, True, message)
-        except Exception as e:
-            self.root.after(0, self.report_result, motor_name, False, str(e))
-    
-    def report_result(self, motor_name, success, message):
+    def show_collision(self, missing):
+        self.main_label.config(text=f"Connect only the '{missing[0]}' motor, one motor at a time.", fg=self.colors['error'])
+        self.status_label.config(text="Several motors are answering on the same ID.", fg=self.colors['error'])
+
+    def show_progress(self, message):
+        self.status_label.config(text=message, fg=self.colors['success'])
+
+    def report_result(self, success, message):
         if success:
+            self.main_label.config(text="Setup Complete!", fg=self.colors['success'])
             self.status_label.config(text=message, fg=self.colors['success'])
-            self.action_button.config(state="normal")
-            # After a short delay, move to the next step
-            self.root.after(1500, self.next_step)
+            self.action_button.config(text="Finish", command=self.root.quit, state="normal")
         else:
             self.status_label.config(text=f"Failed: {message}", fg=self.colors['error'])
-            self.action_button.config(state="normal", text="Retry", command=self.setup_current_motor)
+            self.action_button.config(state="normal", text="Retry", command=self.next_step)
 
 def main():
     parser = argparse.ArgumentParser(description="GUI for setting up LeRobot motors.")
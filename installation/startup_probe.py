@@ -0,0 +1,65 @@
+"""
+Background detection of an existing installation at startup.
+Each check runs on its own worker thread and reports as soon as it
+finishes, and the combined result is saved so the next launch can show the
+last known state before any check has run.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class StartupProbe:
+    """Runs installation checks off the UI thread and remembers their results."""
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+
+    def load_cached(self, install_dir):
+        """Returns the results saved for `install_dir` by the last probe, or None."""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get('install_dir') != install_dir:
+            return None
+        return state.get('results')
+
+    def save(self, install_dir, results):
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'install_dir': install_dir, 'checked_at': time.time(), 'results': results}, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            pass
+
+    def start(self, install_dir, checks, on_result, on_done):
+        """
+        Runs every check in `checks` (name -> callable) concurrently on a
+        background thread. `on_result(name, value)` is called as each one
+        finishes and `on_done(results)` once all have; both run on worker
+        threads, so callers must hand UI work back to the Tk loop.
+        """
+        def probe():
+            results = {}
+            with ThreadPoolExecutor(max_workers=len(checks) or 1) as pool:
+                futures = {pool.submit(check): name for name, check in checks.items()}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        results[name] = bool(future.result())
+                    except Exception:
+                        results[name] = False
+                    on_result(name, results[name])
+            self.save(install_dir, results)
+            on_done(results)
+
+        thread = threading.Thread(target=probe, daemon=True)
+        thread.start()
+        return thread
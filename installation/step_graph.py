@@ -0,0 +1,104 @@
+"""
+Dependency-graph scheduler for installer steps.
+Each step starts as soon as all the steps it depends on have finished, and
+independent steps run side by side on a bounded worker pool.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+_local = threading.local()
+
+
+def current_step():
+    """Returns the InstallStep running on the calling worker thread, or None."""
+    return getattr(_local, 'step', None)
+
+
+class InstallStep:
+    """A single installation step and the names of the steps it depends on."""
+
+    def __init__(self, name, func, message, depends_on=()):
+        self.name = name
+        self.func = func
+        self.message = message
+        self.depends_on = tuple(depends_on)
+
+
+class StepGraph:
+    """Runs a set of InstallSteps in dependency order on a thread pool."""
+
+    def __init__(self, steps, max_workers=3):
+        self.steps = {step.name: step for step in steps}
+        self.max_workers = max_workers
+        self._validate()
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _validate(self):
+        """Rejects unknown dependencies and cycles before anything runs."""
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'.")
+
+        resolved = set()
+        remaining = dict(self.steps)
+        while remaining:
+            ready = [name for name, step in remaining.items() if set(step.depends_on) <= resolved]
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps: {', '.join(sorted(remaining))}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    @staticmethod
+    def _run_step(step):
+        _local.step = step
+        try:
+            return step.func()
+        finally:
+            _local.step = None
+
+    def run(self, on_start=None, on_finish=None):
+        """
+        Runs every step, returning once all have succeeded.
+
+        A step fails by returning a falsy value or raising. No new steps are
+        started after a failure; steps already in flight are allowed to finish
+        and then a RuntimeError is raised. The callbacks are always invoked
+        from the calling thread, never from the workers.
+        """
+        pending = dict(self.steps)
+        done = set()
+        in_flight = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while in_flight or (pending and failure is None):
+                if failure is None:
+                    ready = [step for step in pending.values() if set(step.depends_on) <= done]
+                    for step in ready:
+                        del pending[step.name]
+                        if on_start:
+                            on_start(step)
+                        in_flight[pool.submit(self._run_step, step)] = step
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = in_flight.pop(future)
+                    try:
+                        ok = bool(future.result())
+                    except Exception as e:
+                        ok = False
+                        failure = failure or RuntimeError(f"Step '{step.message}' failed: {e}")
+                    if ok:
+                        done.add(step.name)
+                    elif failure is None:
+                        failure = RuntimeError(f"Step '{step.message}' failed. Check logs for details.")
+                    if on_finish:
+                        on_finish(step, ok)
+
+        if failure is not None:
+            raise failure
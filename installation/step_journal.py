@@ -0,0 +1,78 @@
+"""
+Persistent record of completed installation steps.
+Each entry stores a fingerprint of the inputs the step depended on, so a
+retried install can skip work whose inputs have not changed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+class StepJournal:
+    """A small JSON journal of completed steps kept in the install directory."""
+
+    FILENAME = ".lerobot_install_journal.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILENAME)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def fingerprint(inputs):
+        """Returns a stable hash of a dict of step inputs, or None if any input is unknown."""
+        if any(value is None for value in inputs.values()):
+            return None
+        encoded = json.dumps(inputs, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def is_complete(self, step_name, fingerprint):
+        with self._lock:
+            return fingerprint is not None and self._entries.get(step_name) == fingerprint
+
+    def record(self, step_name, fingerprint):
+        """Marks a step as completed with the given fingerprint."""
+        if fingerprint is None:
+            return
+        with self._lock:
+            self._entries[step_name] = fingerprint
+            self._dirty = True
+            self._flush()
+
+    def discard(self, step_names):
+        """Forgets the given steps, so they run again on the next attempt."""
+        with self._lock:
+            removed = [name for name in step_names if self._entries.pop(name, None) is not None]
+            if removed:
+                self._dirty = True
+                self._flush()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+            self._flush()
+
+    def _flush(self):
+        # The install directory is created by `git clone`, which refuses to
+        # clone into a non-empty directory, so entries recorded before the
+        # clone finishes are held in memory until the directory exists.
+        if not self._dirty or not os.path.isdir(self.directory):
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
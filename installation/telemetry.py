@@ -0,0 +1,135 @@
+"""
+Push-based robot telemetry for the test server.
+One sampler thread reads the arms' state at a fixed rate while any client
+is connected, and each client receives a Server-Sent Events stream at its
+own rate limit. Frames are delta-encoded per client: a keyframe with the
+full state first and then periodically, and in between only the values
+that changed since that client's previous frame, with null for values
+that disappeared (e.g. a motor that stopped answering). A client that
+cannot keep up simply skips intermediate samples. When nothing has been
+written for KEEPALIVE_SECONDS a comment line is sent, so a disconnected
+client is noticed, and its worker freed, within about a second.
+"""
+
+import json
+import threading
+import time
+
+DEFAULT_SAMPLE_HZ = 50
+DEFAULT_CLIENT_HZ = 20
+KEYFRAME_SECONDS = 5.0
+KEEPALIVE_SECONDS = 1.0
+
+
+def delta(previous, current):
+    """
+    Returns the leaves of a nested dict that differ from `previous`, or None
+    if nothing changed. Keys missing from `current` are reported as None.
+    """
+    changed = {}
+    if isinstance(previous, dict):
+        for key in previous.keys() - current.keys():
+            changed[key] = None
+    for key, value in current.items():
+        old = previous.get(key) if isinstance(previous, dict) else None
+        if isinstance(value, dict):
+            nested = delta(old if isinstance(old, dict) else {}, value)
+            if nested:
+                changed[key] = nested
+        elif value != old:
+            changed[key] = value
+    return changed or None
+
+
+def sse_frame(event, data, frame_id=None):
+    """Formats one Server-Sent Events message with compact JSON data."""
+    header = f"id: {frame_id}\n" if frame_id is not None else ""
+    return f"{header}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class TelemetryHub:
+    """Samples state with `sample()` while clients are subscribed and fans it out to them."""
+
+    def __init__(self, sample, rate_hz=DEFAULT_SAMPLE_HZ):
+        self.sample = sample
+        self.rate_hz = rate_hz
+        self.seq = 0
+        self.state = {}
+        self.error = None
+        self.clients = 0
+        self._changed = threading.Condition()
+        self._stop = None
+
+    def _run(self, stop):
+        period = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while not stop.is_set():
+            try:
+                state, error = self.sample(), None
+            except Exception as e:
+                state, error = None, str(e)
+            with self._changed:
+                if state is not None:
+                    self.state = state
+                self.error = error
+                self.seq += 1
+                self._changed.notify_all()
+            next_tick = max(next_tick + period, time.perf_counter())
+            stop.wait(next_tick - time.perf_counter())
+
+    def _subscribe(self):
+        with self._changed:
+            self.clients += 1
+            if self.clients == 1:
+                # The bus is only polled while somebody is watching.
+                self._stop = threading.Event()
+                threading.Thread(target=self._run, args=(self._stop,), daemon=True).start()
+
+    def _unsubscribe(self):
+        with self._changed:
+            self.clients -= 1
+            if self.clients == 0 and self._stop is not None:
+                self._stop.set()
+
+    def wait_for_sample(self, after_seq, timeout):
+        """Blocks until a sample newer than `after_seq` exists; returns (seq, state, error)."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.seq > after_seq, timeout)
+            return self.seq, self.state, self.error
+
+    def stream(self, max_hz=DEFAULT_CLIENT_HZ, keyframe_seconds=KEYFRAME_SECONDS):
+        """Yields SSE frames for one client, at most `max_hz` per second."""
+        max_hz = max(1.0, min(float(max_hz), float(self.rate_hz)))
+        interval = 1.0 / max_hz
+        self._subscribe()
+        try:
+            sent, last_seq, last_keyframe = None, 0, 0.0
+            yield "retry: 1000\n\n"
+            last_write = time.monotonic()
+            while True:
+                started = time.monotonic()
+                seq, state, error = self.wait_for_sample(last_seq, timeout=KEEPALIVE_SECONDS)
+                frame = None
+                if seq != last_seq:
+                    last_seq = seq
+                    if error:
+                        frame = sse_frame('error', {'message': error}, seq)
+                    elif sent is None or started - last_keyframe >= keyframe_seconds:
+                        frame = sse_frame('keyframe', state, seq)
+                        sent, last_keyframe = state, started
+                    else:
+                        changes = delta(sent, state)
+                        if changes:
+                            frame = sse_frame('delta', changes, seq)
+                            sent = state
+                if frame is None and time.monotonic() - last_write >= KEEPALIVE_SECONDS:
+                    # Writing is the only way to find out the client has gone; also keeps proxies from timing out.
+                    frame = ": keep-alive\n\n"
+                if frame is not None:
+                    yield frame
+                    last_write = time.monotonic()
+                remaining = interval - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        finally:
+            self._unsubscribe()
@@ -0,0 +1,221 @@
+"""
+Leader -> follower teleoperation at a fixed control rate.
+Each tick reads every leader motor's position with one sync read and sends
+them to the follower with one sync write, so a tick costs two packets
+regardless of the number of joints. The arms use different motors and
+mount them differently, so raw encoder values do not correspond: each
+position is mapped through the leader joint's calibrated range to a
+fraction of its travel, then onto the follower joint's range. The follower
+moves at most `max_relative_target` ticks per tick, and its goal is seeded
+with its present position before torque is enabled, so starting never
+makes it jump. Timing is tracked per tick: jitter is how late a tick
+started against its schedule, and an overrun is a tick whose work took
+longer than the period.
+
+Calibration comes from the JSON files lerobot writes when an arm is
+calibrated (name -> id, drive_mode, homing_offset, range_min, range_max).
+The homing offset is stored in the motor itself, so present positions
+already include it.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+
+CALIBRATION_DIR = os.path.join(os.path.expanduser("~/.cache/huggingface/lerobot"), "calibration")
+CALIBRATION_SUBDIRS = {'follower': os.path.join("robots", "koch_follower"),
+                       'leader': os.path.join("teleoperators", "koch_leader")}
+
+# Largest follower move per tick, in encoder ticks (4096 per turn): about 3.5 degrees, 700 degrees/s at 200 Hz.
+DEFAULT_MAX_RELATIVE_TARGET = 40
+
+# The last part of each wait is spun rather than slept, since sleeps overshoot by up to a millisecond.
+SPIN_SECONDS = 0.0005
+
+
+class LoopStats:
+    """Timing statistics for a fixed-rate loop, over a window of recent ticks."""
+
+    def __init__(self, period, window=2000):
+        self.period = period
+        self.ticks = 0
+        self.overruns = 0
+        self.read_failures = 0
+        self.max_jitter = 0.0
+        self._jitter = deque(maxlen=window)
+        self._work = deque(maxlen=window)
+        self._starts = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, start, scheduled, work, complete):
+        with self._lock:
+            self.ticks += 1
+            jitter = max(0.0, start - scheduled)
+            self.max_jitter = max(self.max_jitter, jitter)
+            self._jitter.append(jitter)
+            self._work.append(work)
+            self._starts.append(start)
+            if work > self.period:
+                self.overruns += 1
+            if not complete:
+                self.read_failures += 1
+
+    @staticmethod
+    def _percentile(values, fraction):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def snapshot(self):
+        """Returns the statistics as a JSON-ready dict, with times in milliseconds."""
+        with self._lock:
+            jitter = list(self._jitter)
+            work = list(self._work)
+            starts = list(self._starts)
+            ticks, overruns, failures, max_jitter = self.ticks, self.overruns, self.read_failures, self.max_jitter
+        rate = (len(starts) - 1) / (starts[-1] - starts[0]) if len(starts) > 1 and starts[-1] > starts[0] else 0.0
+        return {
+            'target_hz': round(1.0 / self.period, 1),
+            'actual_hz': round(rate, 1),
+            'ticks': ticks,
+            'overruns': overruns,
+            'read_failures': failures,
+            'jitter_ms': {
+                'mean': round(1000 * sum(jitter) / len(jitter), 3) if jitter else 0.0,
+                'p99': round(1000 * self._percentile(jitter, 0.99), 3),
+                'max': round(1000 * max_jitter, 3),
+            },
+            'work_ms': {
+                'mean': round(1000 * sum(work) / len(work), 3) if work else 0.0,
+                'p99': round(1000 * self._percentile(work, 0.99), 3),
+            },
+        }
+
+
+class JointCalibration:
+    """The calibrated travel of one joint, in encoder ticks."""
+
+    def __init__(self, range_min, range_max, drive_mode=0):
+        self.range_min = range_min
+        self.range_max = range_max
+        self.drive_mode = drive_mode
+
+    def normalize(self, ticks):
+        """Returns how far along its range the joint is, from 0.0 to 1.0."""
+        span = self.range_max - self.range_min
+        fraction = min(1.0, max(0.0, (ticks - self.range_min) / span)) if span else 0.5
+        return 1.0 - fraction if self.drive_mode else fraction
+
+    def denormalize(self, fraction):
+        if self.drive_mode:
+            fraction = 1.0 - fraction
+        return round(self.range_min + fraction * (self.range_max - self.range_min))
+
+
+def load_calibration(role, directory=CALIBRATION_DIR):
+    """
+    Reads lerobot's calibration for an arm ('follower' or 'leader') and
+    returns motor ID -> JointCalibration, or None if the arm has not been
+    calibrated. The most recently written file wins if there are several.
+    """
+    paths = glob.glob(os.path.join(directory, CALIBRATION_SUBDIRS[role], "*.json"))
+    if not paths:
+        return None
+    with open(max(paths, key=os.path.getmtime), 'r') as f:
+        data = json.load(f)
+    return {entry['id']: JointCalibration(entry['range_min'], entry['range_max'], entry.get('drive_mode', 0))
+            for entry in data.values()}
+
+
+class TeleopEngine:
+    """Mirrors the leader arm onto the follower on a dedicated control thread."""
+
+    def __init__(self, leader_bus, follower_bus, motor_ids, leader_calibration, follower_calibration,
+                 rate_hz=200, follower_ids=None, max_relative_target=DEFAULT_MAX_RELATIVE_TARGET):
+        self.leader_bus = leader_bus
+        self.follower_bus = follower_bus
+        self.motor_ids = list(motor_ids)
+        # Leader ID -> follower ID; the same IDs on both arms by default.
+        self.id_map = dict(zip(self.motor_ids, follower_ids or self.motor_ids))
+        missing = [i for i in self.motor_ids if i not in leader_calibration] + \
+                  [i for i in self.id_map.values() if i not in follower_calibration]
+        if missing:
+            raise ValueError(f"No calibration for motor IDs {sorted(set(missing))}.")
+        self.leader_calibration = leader_calibration
+        self.follower_calibration = follower_calibration
+        self.max_relative_target = max_relative_target
+        self.period = 1.0 / rate_hz
+        self.stats = LoopStats(self.period)
+        self.positions = {}
+        # Follower ID -> last goal sent, the reference for the per-tick clamp.
+        self.goals = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stats = LoopStats(self.period)
+        self._stop = threading.Event()
+        follower_ids = list(self.id_map.values())
+        present = self.follower_bus.sync_read('present_position', follower_ids)
+        if len(present) != len(follower_ids):
+            missing = sorted(set(follower_ids) - set(present))
+            raise RuntimeError(f"Follower motors {missing} did not report their position.")
+        # The leader is moved by hand; the follower holds where it is until the loop moves it.
+        self.leader_bus.sync_write('torque_enable', {motor_id: 0 for motor_id in self.motor_ids})
+        self.follower_bus.sync_write('goal_position', present)
+        self.goals = dict(present)
+        self.follower_bus.sync_write('torque_enable', {motor_id: 1 for motor_id in follower_ids})
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def stop(self, release=True):
+        """Stops the loop; with `release`, the follower's torque is turned off as well."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if release:
+            self.follower_bus.sync_write('torque_enable', {motor_id: 0 for motor_id in self.id_map.values()})
+
+    def step(self):
+        """Runs one read-write cycle; returns True if every leader motor answered."""
+        positions = self.leader_bus.sync_read('present_position', self.motor_ids, timeout=self.period / 2)
+        if positions:
+            goals = {}
+            for leader_id, ticks in positions.items():
+                follower_id = self.id_map[leader_id]
+                target = self.follower_calibration[follower_id].denormalize(self.leader_calibration[leader_id].normalize(ticks))
+                last = self.goals[follower_id]
+                goals[follower_id] = min(last + self.max_relative_target, max(last - self.max_relative_target, target))
+            self.follower_bus.sync_write('goal_position', goals)
+            self.goals.update(goals)
+            self.positions = positions
+        return len(positions) == len(self.motor_ids)
+
+    def _loop(self, stop):
+        scheduled = time.perf_counter()
+        while not stop.is_set():
+            start = time.perf_counter()
+            complete = self.step()
+            finished = time.perf_counter()
+            self.stats.record(start, scheduled, finished - start, complete)
+
+            scheduled += self.period
+            if finished > scheduled:
+                # Missed ticks are dropped rather than run back to back to catch up.
+                scheduled = finished
+                continue
+            remaining = scheduled - finished
+            if remaining > SPIN_SECONDS:
+                stop.wait(remaining - SPIN_SECONDS)
+            while time.perf_counter() < scheduled:
+                pass
@@ -0,0 +1,220 @@
+"""
+The robot test server behind the installer's "Test Robot" button.
+`create_app` builds the Flask app around a controller object, and
+`TestServer` serves it with waitress, a multi-threaded production WSGI
+server, so chat requests, teleop commands and telemetry streams are
+handled concurrently. Werkzeug's threaded server is used when waitress is
+not installed. Either way the server runs on a background thread and
+`stop()` shuts it down cleanly, closing open connections, within a
+bounded time and optionally on a background thread so a GUI caller does
+not block. Stopping waitress uses its server internals (the trigger, the
+channel map and the task dispatcher), so waitress is pinned in
+requirements.txt.
+
+The controller is normally a RobotSession. It must provide `log(message)`,
+`handle_chat_command(message)`, `get_teleop_engine()`, and the `teleop` and
+`telemetry` attributes.
+
+Run directly to serve without the Tk installer, e.g. for CI and benchmarks:
+    python -m installation.test_server --simulate
+    python -m installation.test_server --follower /dev/ttyACM0 --leader /dev/ttyACM1
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+from installation.lazy_import import LazyModule
+from installation.telemetry import DEFAULT_CLIENT_HZ
+
+flask = LazyModule("flask", "The robot test server")
+flask_cors = LazyModule("flask_cors", "The robot test server")
+waitress_server = LazyModule("waitress.server", "Production serving of the robot test server")
+werkzeug_serving = LazyModule("werkzeug.serving", "The robot test server")
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web_interface")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7860
+DEFAULT_THREADS = 8
+
+
+class _StreamSlot:
+    """Wraps a streaming response so its slot is returned when the server closes it."""
+
+    def __init__(self, stream, release):
+        self.stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return self.stream
+
+    def close(self):
+        self.stream.close()
+        if not self._released:
+            self._released = True
+            self._release()
+
+
+def create_app(controller, max_streams=DEFAULT_THREADS - 2):
+    """
+    Builds the Flask app. At most `max_streams` telemetry streams are open
+    at once, since each holds a worker thread; the remaining workers stay
+    free for chat and teleop requests.
+    """
+    app = flask.Flask(__name__, static_folder=STATIC_DIR)
+    flask_cors.CORS(app)
+    stream_slots = threading.BoundedSemaphore(max(1, max_streams))
+
+    @app.route('/')
+    def index():
+        return flask.send_from_directory(app.static_folder, 'index.html')
+
+    @app.route('/api/chat', methods=['POST'])
+    def chat():
+        user_message = (flask.request.get_json(silent=True) or {}).get('message', '')
+        controller.log(f"Received message from web UI: {user_message}")
+        return flask.jsonify({'response': controller.handle_chat_command(user_message)})
+
+    @app.route('/api/teleop/start', methods=['POST'])
+    def teleop_start():
+        try:
+            controller.get_teleop_engine().start()
+        except Exception as e:
+            return flask.jsonify({'error': str(e)}), 500
+        return flask.jsonify({'running': True})
+
+    @app.route('/api/teleop/stop', methods=['POST'])
+    def teleop_stop():
+        if controller.teleop is not None:
+            controller.teleop.stop()
+        return flask.jsonify({'running': False})
+
+    @app.route('/api/teleop/stats')
+    def teleop_stats():
+        if controller.teleop is None:
+            return flask.jsonify({'running': False})
+        return flask.jsonify({'running': controller.teleop.running, **controller.teleop.stats.snapshot()})
+
+    @app.route('/api/telemetry')
+    def telemetry():
+        # Each client picks its own update rate, e.g. /api/telemetry?hz=10
+        hz = flask.request.args.get('hz', default=DEFAULT_CLIENT_HZ, type=float)
+        if not stream_slots.acquire(blocking=False):
+            return flask.jsonify({'error': "Too many telemetry clients are connected."}), 503
+        stream = _StreamSlot(controller.telemetry.stream(hz), stream_slots.release)
+        return flask.Response(stream, mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    return app
+
+
+class TestServer:
+    """Serves a WSGI app on a background thread until `stop()` is called."""
+
+    def __init__(self, app, host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.threads = threads
+        self.backend = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Binds the port and starts serving; raises OSError if the port is taken."""
+        if self.running:
+            return
+        if waitress_server.available:
+            self.backend = 'waitress'
+            self._server = waitress_server.create_server(self.app, host=self.host, port=self.port, threads=self.threads)
+            target = self._server.run
+        else:
+            # No worker limit here: Werkzeug starts a thread per request.
+            self.backend = 'werkzeug'
+            self._server = werkzeug_serving.make_server(self.host, self.port, self.app, threaded=True)
+            target = self._server.serve_forever
+        # Port 0 picks a free port; report the real one.
+        self.port = self._server.socket.getsockname()[1] if self.backend == 'werkzeug' else self._server.effective_port
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0, wait=True):
+        """
+        Closes the listening socket and every open connection, then waits up
+        to `timeout` seconds each for the serve thread and the workers. With
+        `wait=False` this happens on a background thread, which is returned.
+        """
+        server, self._server = self._server, None
+        if server is None:
+            return None
+        if not wait:
+            thread = threading.Thread(target=self._shutdown, args=(server, self._thread, timeout), daemon=True)
+            thread.start()
+            return thread
+        self._shutdown(server, self._thread, timeout)
+        return None
+
+    def _shutdown(self, server, serve_thread, timeout):
+        if self.backend == 'waitress':
+            # Channels belong to the server's event loop, so they are closed from inside it.
+            server.trigger.pull_trigger(lambda: [channel.close() for channel in list(server._map.values())])
+            serve_thread.join(timeout)
+            server.task_dispatcher.shutdown(cancel_pending=True, timeout=timeout)
+        else:
+            server.shutdown()
+            server.server_close()
+            serve_thread.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the robot test page without the installer window.")
+    arms = parser.add_mutually_exclusive_group(required=True)
+    arms.add_argument("--simulate", action="store_true", help="Use simulated arms instead of hardware.")
+    arms.add_argument("--follower", help="Serial port of the follower arm.")
+    parser.add_argument("--leader", help="Serial port of the leader arm.")
+    parser.add_argument("--move", action="store_true", help="With --simulate, keep the simulated leader arm moving.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on; 0 picks a free one.")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Worker threads.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print a line per request.")
+    args = parser.parse_args()
+    if args.follower and not args.leader:
+        parser.error("--leader is required with --follower")
+
+    from installation.robot_session import RobotSession, print_log
+    log = (lambda message, level='info': None) if args.quiet else print_log
+    if args.simulate:
+        session = RobotSession.simulated(log=log, move_leader=args.move)
+    else:
+        from installation.motor_setup import MotorSetupService, arm_motor_table
+        service = MotorSetupService()
+        ports = {'follower': args.follower, 'leader': args.leader}
+        session = RobotSession(lambda role: service.bus(ports[role]),
+                               lambda role: [spec.id for spec in arm_motor_table(role)], log=log)
+
+    server = TestServer(create_app(session, max_streams=args.threads - 2), args.host, args.port, args.threads)
+    server.start()
+    # The URL line is read by tools that start the server as a subprocess.
+    print(f"Serving on {server.url} ({server.backend}, {args.threads} threads)", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.stop()
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,7 +16,6 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 try:
     from ui.welcome_ui import WelcomeScreen
     from robot_installer import LeRobotInstaller
-    from PIL import ImageTk, Image
 except ImportError as e:
     messagebox.showerror("Import Error", f"A required module is missing: {e}\n\nPlease ensure all files are in their correct locations and required libraries are installed.")
     sys.exit(1)
@@ -62,7 +61,8 @@ def main():
         messagebox.showerror("Error", "Python 3.6 or higher is required.")
         return
     
-    # Pillow is checked here implicitly by the import at the top
+    # Pillow is optional at startup: it is loaded when the first image is drawn,
+    # and text placeholders are shown if it is missing.
 
     root = tk.Tk()
     app = MainApplication(root)
@@ -9,20 +9,26 @@ from tkinter import messagebox, filedialog
 import subprocess
 import threading
 import os
-import sys
 import shutil
-from pathlib import Path
-import platform
-import time
+import hashlib
+import shlex
 import webbrowser
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
 
 from ui.installer_ui import InstallerUI
-from installation.motor_setup_ui import MotorSetupUI
-from lerobot.common.robots import make_robot_from_config, RobotConfig, koch_follower
-from lerobot.common.teleoperators import make_teleoperator_from_config, TeleoperatorConfig, koch_leader
-from installation.setup_motors_gui import MotorSetupApp # Assuming this will be used
+from installation.step_graph import InstallStep, StepGraph, current_step
+from installation.command_runner import OutputBudget, run_streaming
+from installation.log_store import LogStore
+from installation.package_cache import PackageCache, cache_key
+from installation import bundle, clone_strategy
+from installation.conda_resolver import CondaResolver
+from installation.startup_probe import StartupProbe
+from installation.step_journal import StepJournal
+from installation.port_watcher import PortWatcher
+from installation.port_identity import PortIdentity, PortIdentityStore, scan_ports, stable_path
+from installation import bus_scanner, config_writer
+from installation.motor_setup import MotorSetupService, arm_motor_table
+from installation.robot_session import RobotSession
+from installation import test_server
 
 class LeRobotInstaller:
     def __init__(self, root):
@@ -36,45 +42,102 @@ class LeRobotInstaller:
         self.port_discovery_running = False
         self.total_steps = 8
         self.current_step = 0
-        self.ports_before_unplug = []
+        self.max_parallel_steps = 3
+        self.running_steps = []
+        self.step_fractions = {}
+        self.step_output_budgets = {}
+        self._progress_lock = threading.Lock()
+        self.max_step_output_bytes = 512 * 1024
+        self.journal = None
+        self.ports_before_unplug = set()
         self.current_device_for_port_finding = ""
+        self.awaiting_unplug = False
+        self.port_watcher = PortWatcher()
+        self.port_watcher.add_listener(self._on_port_event)
         
        
         self.install_dir = os.path.expanduser("~/lerobot")
+
+        # --- Cloning ---
+        # LEROBOT_GIT_MIRROR names a local mirror shared by every user on the machine.
+        self.repo_url = os.environ.get("LEROBOT_REPO_URL", clone_strategy.REPO_URL)
+        self.git_mirror = os.environ.get("LEROBOT_GIT_MIRROR")
+        self.clone_strategy = os.environ.get("LEROBOT_CLONE_STRATEGY", "auto")
         
         # --- Port Discovery ---
         self.follower_port = None
         self.leader_port = None
 
         # --- Logging ---
-        self.terminal_output = []
+        self.state_dir = os.path.expanduser("~/.lerobot_installer")
+        self.terminal_output = LogStore(os.path.join(self.state_dir, "installer.log"))
+
+        # Arms are remembered by USB identity so later sessions can skip port discovery
+        self.port_identities = PortIdentityStore(os.path.join(self.state_dir, "arm_ports.json"))
+        self.port_infos_before_unplug = {}
+
+        # --- Motor Setup ---
+        # One connection per arm port, shared by setup and later by teleoperation.
+        self.motor_setup = MotorSetupService()
+        self.arm_motor_ids = {}
+        # Teleoperation and telemetry for the test server, on the same connections.
+        self.robot_session = RobotSession(self._arm_bus, self._arm_motor_ids, log=self.log)
+
+        # --- Test Server ---
+        # Each telemetry stream holds a worker thread; two are always left for requests.
+        self.web_server = None
+        self.web_server_threads = max(3, int(os.environ.get("LEROBOT_SERVER_THREADS", test_server.DEFAULT_THREADS)))
+
+        # --- Package Cache ---
+        # Point LEROBOT_PACKAGE_CACHE at a shared directory to reuse downloads across stations.
+        self.conda = CondaResolver()
+        self.package_cache = PackageCache(os.environ.get("LEROBOT_PACKAGE_CACHE") or os.path.join(self.state_dir, "cache"))
         
         # --- UI ---
         self.ui = InstallerUI(self.root, self)
 
-        # Check for existing install on startup
-        self.root.after(200, self._check_on_startup)
+        # Check for existing install on startup, without blocking the window
+        self.startup_probe = StartupProbe(os.path.join(self.state_dir, "startup_state.json"))
+        self.root.after_idle(self._check_on_startup)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def _check_on_startup(self):
-        """Checks for an existing installation when the app starts."""
-        if self._installation_exists():
-            self.installation_complete = True
-            self.ui.set_button_state('install', 'Installed', 'text_secondary')
-            self.ui.set_button_state('motor', 'Find Ports', 'text_primary')
-            self.ui.update_progress(8, 8, "Existing installation detected.")
-
-    def _installation_exists(self):
-        """Checks if a LeRobot directory or conda environment already exists."""
-        dir_exists = os.path.exists(self.install_dir)
-        conda_path = shutil.which('conda')
-        if not conda_path:
-            return dir_exists
-        try:
-            process = subprocess.run([conda_path, "env", "list"], capture_output=True, text=True, timeout=10)
-            env_exists = any(line.strip().startswith('lerobot ') for line in process.stdout.splitlines())
-            return dir_exists or env_exists
-        except Exception:
-            return dir_exists
+        """Shows the last known install state, then re-checks it in the background."""
+        install_dir = self.install_dir
+        cached = self.startup_probe.load_cached(install_dir)
+        if cached and any(cached.values()):
+            self._show_existing_installation("Existing installation detected (last known state).")
+
+        checks = {
+            'install_dir': lambda: os.path.exists(install_dir),
+            'conda_env': lambda: self.conda.env_path("lerobot") is not None,
+        }
+        self.startup_probe.start(
+            install_dir, checks,
+            on_result=lambda name, found: self.ui.dispatcher.call(self._on_probe_result, name, found),
+            on_done=lambda results: self.ui.dispatcher.call(self._on_probe_done, install_dir, results),
+        )
+
+    def _on_probe_result(self, name, found):
+        """Updates the UI as soon as any startup check finds an installation."""
+        if found and not self.installation_complete and not self.installation_thread_running:
+            self._show_existing_installation("Existing installation detected.")
+
+    def _on_probe_done(self, install_dir, results):
+        """Reverts a stale cached state once every startup check has come back negative."""
+        if any(results.values()) or install_dir != self.install_dir or self.installation_thread_running:
+            return
+        if self.installation_complete:
+            self.installation_complete = False
+            self.ui.set_button_state('install', 'Install', 'text_primary')
+            self.ui.set_button_state('motor', 'Find Ports', 'text_secondary')
+            self.ui.update_progress(0, self.total_steps, "Ready to begin.")
+
+    def _show_existing_installation(self, message):
+        self.installation_complete = True
+        self.ui.set_button_state('install', 'Installed', 'text_secondary')
+        self.ui.set_button_state('motor', 'Find Ports', 'text_primary')
+        self.ui.update_progress(self.total_steps, self.total_steps, message)
 
     def handle_install_click(self):
         self.start_installation()
@@ -106,6 +169,30 @@ class LeRobotInstaller:
             self.install_dir = os.path.join(new_parent, "lerobot")
             self.ui.update_install_dir_text(self.install_dir)
 
+    def handle_import_bundle_click(self):
+        if self.installation_thread_running:
+            messagebox.showwarning("Busy", "Please wait for the current operation to finish.")
+            return
+        if self.installation_complete:
+            messagebox.showinfo("Already Installed", "LeRobot is already installed. You can proceed to find ports.")
+            return
+        archive_path = filedialog.askopenfilename(title="Choose Offline Bundle", filetypes=[("LeRobot bundle", "*.tar"), ("All files", "*")])
+        if archive_path:
+            self._reset_ui_for_install()
+            threading.Thread(target=self._installation_thread, args=(archive_path,), daemon=True).start()
+
+    def handle_export_bundle_click(self):
+        if self.installation_thread_running:
+            messagebox.showwarning("Busy", "Please wait for the current operation to finish.")
+            return
+        if not self.installation_complete:
+            messagebox.showwarning("Prerequisites Not Met", "Please complete the installation before exporting a bundle.")
+            return
+        archive_path = filedialog.asksaveasfilename(title="Save Offline Bundle", defaultextension=".tar",
+                                                    initialfile="lerobot-bundle.tar", filetypes=[("LeRobot bundle", "*.tar")])
+        if archive_path:
+            threading.Thread(target=self._export_bundle_thread, args=(archive_path,), daemon=True).start()
+
     def handle_port_finder_action_click(self):
         """Handles the main action button click during the port finding process."""
         # This function is called by the UI's action button.
@@ -134,94 +221,354 @@ class LeRobotInstaller:
         self.ui.set_button_state('motor', '🎯 Find Ports', 'text_primary')
         self.ui.set_button_state('install', 'Installed', 'text_secondary')
         if not silent:
-            messagebox.showinfo("Success", "LeRobot has been installed successfully!")
+            self.ui.dispatcher.call(messagebox.showinfo, "Success", "LeRobot has been installed successfully!")
 
     def _reset_ui_for_install(self):
         """Clears logs and resets the UI for a new installation."""
         self.terminal_output.clear()
         self.update_progress(0, "Ready to begin installation")
 
-    def _installation_thread(self):
+    def _installation_thread(self, bundle_path=None):
         """The main installation logic running in a separate thread."""
         self.installation_thread_running = True
         self.ui.set_button_state('install', 'Installing...', 'text_secondary')
         
         try:
-            steps = [
-                (self._check_prerequisites, "Checking prerequisites..."),
-                (self._clone_repository, f"Cloning repository into {self.install_dir}..."),
-                (self._create_conda_environment, "Creating conda environment 'lerobot'..."),
-                (self._install_ffmpeg, "Installing ffmpeg..."),
-                (self._install_lerobot, "Installing LeRobot package..."),
-                (self._install_dynamixel, "Installing Dynamixel SDK..."),
-                (self._install_additional_dependencies, "Installing additional dependencies..."),
-                (self._verify_installation, "Verifying installation..."),
-            ]
-
-            for i, (func, msg) in enumerate(steps):
-                self.update_progress(i, msg)
-                if not func():
-                    raise RuntimeError(f"Step '{msg}' failed. Check logs for details.")
-            
+            self.journal = StepJournal(self.install_dir)
+            steps = self._bundle_import_steps(bundle_path) if bundle_path else self._install_steps()
+            graph = StepGraph(steps, max_workers=self.max_parallel_steps)
+            self.total_steps = len(graph)
+            self.running_steps = []
+            self.step_fractions = {}
+            graph.run(on_start=self._on_step_started, on_finish=self._on_step_finished)
+
             self._finalize_installation()
 
         except Exception as e:
-            self.log(f"Error during installation: {e}")
-            messagebox.showerror("Installation Failed", f"An error occurred: {e}")
+            self.log(f"Error during installation: {e}", level='error')
+            self.ui.dispatcher.call(messagebox.showerror, "Installation Failed", f"An error occurred: {e}")
             self.ui.set_button_state('install', 'Retry Install', 'error')
 
         finally:
             self.installation_thread_running = False
 
+    def _install_steps(self):
+        """The networked install: clone the repo and build the env from package indexes."""
+        # Cloning only needs git, so it overlaps with environment creation.
+        # Everything that modifies the 'lerobot' env stays strictly ordered.
+        return [
+            InstallStep('prerequisites', self._check_prerequisites, "Checking prerequisites..."),
+            InstallStep('clone', self._clone_repository, f"Cloning repository into {self.install_dir}...", ['prerequisites']),
+            *self._env_steps(env_after=['prerequisites'], checkout=['clone']),
+        ]
+
+    def _env_steps(self, env_after, checkout):
+        """Steps that build the 'lerobot' env; `checkout` names the step that provides the repo."""
+        # Each env step builds on the ones before it, so running one again invalidates everything after it.
+        chain = ['conda_env', 'ffmpeg', 'lerobot', 'dynamixel', 'additional']
+        after = {name: chain[i + 1:] for i, name in enumerate(chain)}
+        return [
+            InstallStep('conda_env', self._journaled('conda_env', self._create_conda_environment, ['env'], after['conda_env']), "Creating conda environment 'lerobot'...", env_after),
+            InstallStep('ffmpeg', self._journaled('ffmpeg', self._install_ffmpeg, ['env'], after['ffmpeg']), "Installing ffmpeg...", ['conda_env']),
+            InstallStep('lerobot', self._journaled('lerobot', self._install_lerobot, ['env', 'commit'], after['lerobot']), "Installing LeRobot package...", [*checkout, 'ffmpeg']),
+            InstallStep('dynamixel', self._journaled('dynamixel', self._install_dynamixel, ['env'], after['dynamixel']), "Installing Dynamixel SDK...", ['lerobot']),
+            InstallStep('additional', self._journaled('additional', self._install_additional_dependencies, ['env', 'commit', 'requirements']), "Installing additional dependencies...", ['dynamixel']),
+            InstallStep('verify', self._verify_installation, "Verifying installation...", ['additional']),
+        ]
+
+    def _bundle_import_steps(self, bundle_path):
+        """
+        The offline install from a bundle. A packed env is restored as-is;
+        otherwise the bundle's packages seed the cache and the env is rebuilt
+        from it with no network access.
+        """
+        manifest = bundle.read_manifest(bundle_path)
+        steps = [
+            InstallStep('prerequisites', lambda: self.conda.conda_exe, "Checking prerequisites..."),
+            InstallStep('unpack', lambda: bundle.unpack_checkout(bundle_path, self.install_dir, manifest.get('commit'), self._get_commit_hash()),
+                        f"Unpacking repository into {self.install_dir}...", ['prerequisites']),
+            InstallStep('seed_cache', lambda: bundle.seed_cache(bundle_path, self.package_cache), "Copying bundled packages into the cache...", ['prerequisites']),
+        ]
+        if manifest['env'] != 'packed':
+            return steps + self._env_steps(env_after=['seed_cache'], checkout=['unpack'])
+        return steps + [
+            InstallStep('restore_env', lambda: bundle.restore_packed_env(bundle_path, self._get_conda_env_dir(), self._run_command),
+                        "Restoring conda environment 'lerobot'...", ['prerequisites']),
+            InstallStep('relink', self._relink_lerobot, "Linking LeRobot package...", ['unpack', 'seed_cache', 'restore_env']),
+            InstallStep('verify', self._verify_installation, "Verifying installation...", ['relink']),
+        ]
+
+    def _relink_lerobot(self):
+        """Re-creates the editable install that conda-pack leaves out of a packed env."""
+        pip = self._get_conda_executable('pip')
+        wheelhouse = shlex.quote(self.package_cache.wheelhouse)
+        return self._run_command(f"{pip} install --no-index --find-links {wheelhouse} --no-deps -e .", cwd=self.install_dir)
+
+    def _export_bundle_thread(self, archive_path):
+        """Writes an offline bundle of the current installation."""
+        self.installation_thread_running = True
+        try:
+            self.log(f"Exporting offline bundle to {archive_path}...")
+            manifest = bundle.export_bundle(archive_path, self.install_dir, self.package_cache,
+                                            env_path=self._get_conda_env_path(), commit=self._get_commit_hash(), run=self._run_command)
+            self.log(f"Bundle written to {archive_path} (environment: {manifest['env']}).")
+            self.ui.dispatcher.call(messagebox.showinfo, "Bundle Exported", f"Offline bundle saved to:\n{archive_path}")
+        except Exception as e:
+            self.log(f"Error exporting bundle: {e}", level='error')
+            self.ui.dispatcher.call(messagebox.showerror, "Export Failed", f"An error occurred: {e}")
+        finally:
+            self.installation_thread_running = False
+
+    def _journaled(self, name, func, inputs, dependents=()):
+        """
+        Wraps a step so it is skipped when the journal shows its inputs are
+        unchanged. When the step does run, the `dependents` built on top of
+        its result are dropped from the journal so they run again as well.
+        """
+        def run_step():
+            fingerprint = StepJournal.fingerprint(self._step_inputs(inputs))
+            if self.journal.is_complete(name, fingerprint):
+                self.log(f"Skipping '{name}': already completed with the same inputs.")
+                return True
+            # Dropped before running, so a failure here still leaves them to be redone.
+            self.journal.discard(dependents)
+            if not func():
+                return False
+            # Inputs such as the commit hash may only exist once the step has run.
+            self.journal.record(name, StepJournal.fingerprint(self._step_inputs(inputs)))
+            return True
+        return run_step
+
+    def _step_inputs(self, keys):
+        """Collects the current value of each named step input; None means unknown."""
+        sources = {
+            'env': self._get_conda_env_path,
+            'commit': self._get_commit_hash,
+            'requirements': self._get_requirements_hash,
+        }
+        return {key: sources[key]() for key in keys}
+
+    def _get_commit_hash(self):
+        try:
+            process = subprocess.run(["git", "-C", self.install_dir, "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10)
+        except Exception:
+            return None
+        if process.returncode != 0:
+            return None
+        return process.stdout.strip() or None
+
+    def _get_requirements_hash(self):
+        req_path = os.path.join(self.install_dir, "requirements.txt")
+        if not os.path.exists(req_path):
+            return "absent"
+        with open(req_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _on_step_started(self, step):
+        """Adds a step to the in-flight list shown next to the progress bar."""
+        with self._progress_lock:
+            self.running_steps.append(step)
+            self.step_fractions[step.name] = 0.0
+            # Every command a step runs shares one output cap.
+            self.step_output_budgets[step.name] = OutputBudget(self.max_step_output_bytes)
+        self._show_running_steps()
+
+    def _on_step_finished(self, step, success):
+        """Removes a finished step and advances the progress bar."""
+        with self._progress_lock:
+            self.running_steps.remove(step)
+            self.step_fractions.pop(step.name, None)
+            self.step_output_budgets.pop(step.name, None)
+            if success:
+                self.current_step += 1
+            still_running = bool(self.running_steps)
+        if still_running:
+            self._show_running_steps()
+
+    def _update_step_fraction(self, step, fraction):
+        """Moves the progress bar within a running step as its command reports progress."""
+        with self._progress_lock:
+            if step.name not in self.step_fractions or fraction <= self.step_fractions[step.name]:
+                # A step's progress only moves forward, across all of its commands.
+                return
+            self.step_fractions[step.name] = fraction
+            value = self.current_step + sum(self.step_fractions.values())
+            message = " | ".join(s.message for s in self.running_steps)
+        self.ui.update_progress(value, self.total_steps, message)
+
+    def _show_running_steps(self):
+        with self._progress_lock:
+            message = " | ".join(s.message for s in self.running_steps)
+            step = self.current_step
+        self.update_progress(step, message)
+
     def _finalize_installation(self):
         """Finalizes the installation, updating the UI."""
         self._update_ui_for_existing_install()
 
     def _check_prerequisites(self):
         """Checks for Git and Conda."""
-        return shutil.which("git") and shutil.which("conda")
+        return shutil.which("git") and self.conda.conda_exe
 
     def _clone_repository(self):
         if os.path.exists(self.install_dir):
             return True
-        return self._run_command(f"git clone https://github.com/huggingface/lerobot.git {self.install_dir}")
+        for strategy in clone_strategy.available_strategies(self.clone_strategy, self.git_mirror):
+            args = clone_strategy.clone_command(strategy, self.repo_url, self.install_dir, self.git_mirror)
+            self.log(f"Cloning with the '{strategy}' strategy...")
+            if self._run_command(" ".join(shlex.quote(arg) for arg in args)) and clone_strategy.verify_checkout(self.install_dir):
+                return True
+            self.log(f"The '{strategy}' clone failed verification, trying the next strategy.", level='warning')
+            shutil.rmtree(self.install_dir, ignore_errors=True)
+        return False
 
     def _create_conda_environment(self):
-        return self._run_command(f"{shutil.which('conda')} create -n lerobot python=3.10 -y")
+        return self._conda_install(f"{shlex.quote(self.conda.conda_exe)} create -n lerobot python=3.10 -y", cache_key("conda", "create", "python=3.10"))
 
     def _install_ffmpeg(self):
-        return self._run_command(f"{self._get_conda_executable('conda')} install conda-forge::ffmpeg -y")
+        return self._conda_install(f"{shlex.quote(self.conda.conda_exe)} install -n lerobot conda-forge::ffmpeg -y", cache_key("conda", "conda-forge::ffmpeg"))
 
     def _install_lerobot(self):
-        return self._run_command(f"{self._get_conda_executable('pip')} install -e .", cwd=self.install_dir)
+        key = cache_key("pip", "-e .", self._get_commit_hash())
+        build_requirements = " ".join(shlex.quote(req) for req in self._get_build_requirements())
+        return self._pip_install("-e .", key, cwd=self.install_dir, wheel_args=f"-e . {build_requirements}")
 
     def _install_dynamixel(self):
-        return self._run_command(f"{self._get_conda_executable('pip')} install dynamixel-sdk", cwd=self.install_dir)
+        return self._pip_install("dynamixel-sdk", cache_key("pip", "dynamixel-sdk"), cwd=self.install_dir)
 
     def _install_additional_dependencies(self):
         req_path = os.path.join(self.install_dir, "requirements.txt")
         if not os.path.exists(req_path):
             return True
-        return self._run_command(f"{self._get_conda_executable('pip')} install -r {req_path}", cwd=self.install_dir)
+        key = cache_key("pip", "-r requirements.txt", self._get_requirements_hash())
+        return self._pip_install(f"-r {shlex.quote(req_path)}", key, cwd=self.install_dir)
+
+    def _pip_install(self, args, key, cwd=None, wheel_args=None):
+        """
+        Installs pip packages through the shared wheelhouse. A request seen
+        before installs offline once its wheels pass verification; otherwise
+        its wheels are built into the wheelhouse first and, once installed,
+        the request is recorded with the wheels pip reports it needs.
+        """
+        pip = self._get_conda_executable('pip')
+        wheelhouse = shlex.quote(self.package_cache.wheelhouse)
+        if self.package_cache.is_warm(key):
+            corrupted = self.package_cache.verify(key)
+            if corrupted:
+                self.log(f"Cached packages failed verification ({', '.join(corrupted)}), falling back to the package index.", level='warning')
+            elif self._run_command(f"{pip} install --no-index --find-links {wheelhouse} {args}", cwd=cwd):
+                return True
+            else:
+                self.log("Cached packages are incomplete, falling back to the package index.", level='warning')
+
+        # Building wheels and installing them each fill half of the step's progress.
+        if not self._run_command(f"{pip} wheel --wheel-dir {wheelhouse} {wheel_args or args}", cwd=cwd, progress_range=(0.0, 0.5)):
+            self.log("Could not fill the package cache, installing directly.", level='warning')
+            return self._run_command(f"{pip} install {args}", cwd=cwd)
+        if not self._run_command(f"{pip} install --find-links {wheelhouse} {args}", cwd=cwd, progress_range=(0.5, 1.0)):
+            return False
+        self._record_pip_request(pip, key, args, cwd)
+        return True
+
+    def _record_pip_request(self, pip, key, args, cwd):
+        """Records the wheels a request needs, as resolved offline from the wheelhouse by pip."""
+        report_path = os.path.join(self.package_cache.root, f".report-{key}.json")
+        wheelhouse = shlex.quote(self.package_cache.wheelhouse)
+        try:
+            # --ignore-installed lists every requirement, not just the ones missing from this env.
+            self._run_command(f"{pip} install --dry-run --ignore-installed --no-index --find-links {wheelhouse} "
+                              f"--report {shlex.quote(report_path)} {args}", cwd=cwd)
+            wheels = self.package_cache.report_wheels(report_path)
+        finally:
+            if os.path.exists(report_path):
+                os.remove(report_path)
+        if wheels is None:
+            self.log("Could not determine which cached packages this install needs; it will not be repeated offline.", level='warning')
+            return
+        self.package_cache.record(key, wheels)
+
+    def _conda_install(self, command, key):
+        """Runs a conda create/install against the shared pkgs dir, offline once it is cached."""
+        env = self.package_cache.conda_env()
+        if self.package_cache.is_warm(key):
+            if self._run_command(f"{command} --offline", env=env):
+                return True
+            self.log("Cached conda packages are incomplete, falling back to the network.", level='warning')
+        if not self._run_command(command, env=env):
+            return False
+        self.package_cache.record(key)
+        return True
+
+    def _get_build_requirements(self):
+        """Reads the build backend requirements of the cloned package, so they are cached too."""
+        try:
+            import tomllib
+            with open(os.path.join(self.install_dir, "pyproject.toml"), 'rb') as f:
+                return tomllib.load(f).get('build-system', {}).get('requires', [])
+        except (ImportError, OSError, ValueError):
+            return []
 
     def _verify_installation(self):
-        return self._run_command(f"{self._get_conda_executable('python')} -c 'import lerobot; print(lerobot.__version__)'")
+        if self._run_command(f"{self._get_conda_executable('python')} -c 'import lerobot; print(lerobot.__version__)'"):
+            return True
+        if self.journal is not None:
+            # Something the journal believes is installed is not; the next attempt redoes every step.
+            self.log("Verification failed; every step will run again on the next attempt.", level='warning')
+            self.journal.clear()
+        return False
+
+    def _get_conda_env_dir(self):
+        """Returns where the 'lerobot' conda env lives, whether or not it exists yet."""
+        return self.conda.env_path("lerobot") or self.conda.default_env_path("lerobot")
+
+    def _get_conda_env_path(self):
+        """Returns the path of the 'lerobot' conda env, or None if it does not exist."""
+        return self.conda.env_path("lerobot")
 
     def _get_conda_executable(self, name):
-        conda_path = shutil.which('conda')
-        if not conda_path: return name
-        conda_base_dir = os.path.dirname(os.path.dirname(conda_path))
-        env_bin_path = os.path.join(conda_base_dir, "envs", "lerobot", "bin", name)
-        return env_bin_path if os.path.exists(env_bin_path) else f"{shutil.which('conda')} run -n lerobot --no-capture-output {name}"
+        """Resolves an executable inside the 'lerobot' env to its path, or to a `conda run` command."""
+        path = self.conda.executable("lerobot", name)
+        if path:
+            return shlex.quote(path)
+        python = self.conda.executable("lerobot", "python")
+        if name == 'pip' and python:
+            return f"{shlex.quote(python)} -m pip"
+        # Never fall back to whatever is first on PATH, which would target another interpreter.
+        conda_exe = self.conda.conda_exe
+        if not conda_exe:
+            raise RuntimeError(f"Cannot find '{name}' in the 'lerobot' conda environment, and conda itself was not found.")
+        self.log(f"'{name}' not found in the 'lerobot' environment, running it through 'conda run'.", level='warning')
+        return f"{shlex.quote(conda_exe)} run --no-capture-output -n lerobot {name}"
 
     def start_port_discovery(self):
         """Starts the step-by-step port discovery process in the main UI."""
-        self.log("Starting guided port discovery...")
         self.port_discovery_running = True
+        if self._resolve_known_ports():
+            self._find_next_port()
+            return
+
+        self.log("Starting guided port discovery...")
         self.ui.show_port_finding_view()
         # Start with the follower device
         threading.Thread(target=self._find_next_port, daemon=True).start()
 
+    def _resolve_known_ports(self):
+        """Finds previously identified arms by USB identity; True if both are connected."""
+        try:
+            resolved = self.port_identities.resolve()
+        except Exception as e:
+            self.log(f"Could not resolve known arm ports: {e}", level='warning')
+            return False
+        if not (resolved.get('follower') and resolved.get('leader')):
+            return False
+
+        self.follower_port = resolved['follower']
+        self.leader_port = resolved['leader']
+        self.ui.update_follower_port_display(self.follower_port)
+        self.ui.update_leader_port_display(self.leader_port)
+        self.log(f"Found known arms by USB identity. Follower: {self.follower_port}, Leader: {self.leader_port}")
+        return True
+
     def _find_next_port(self):
         """Determines which device to find next and starts the process."""
         if not self.follower_port:
@@ -231,83 +578,99 @@ class LeRobotInstaller:
         else:
             # Both are found, process is complete.
             self.port_discovery_running = False
+            self.port_watcher.stop()
             self.ui.show_installation_view() # Switch back to main view
             if self.follower_port and self.leader_port:
-                messagebox.showinfo("Success", f"Both ports found!\n\nFollower: {self.follower_port}\nLeader: {self.leader_port}", parent=self.root)
+                self.ui.dispatcher.call(messagebox.showinfo, "Success", f"Both ports found!\n\nFollower: {self.follower_port}\nLeader: {self.leader_port}", parent=self.root)
                 self.ui.set_button_state('setup', '⚙️ Set Up Motors', 'text_primary') # Enable setup button
             else:
-                messagebox.showwarning("Incomplete", "One or more ports were not identified.", parent=self.root)
+                self.ui.dispatcher.call(messagebox.showwarning, "Incomplete", "One or more ports were not identified.", parent=self.root)
             return
         
         self._prepare_for_unplug()
 
-    def _find_available_ports(self):
+    def _start_port_watcher(self):
+        """Starts watching USB-serial hotplug events; returns False if that is not possible."""
         try:
-            from serial.tools import list_ports
-            if platform.system() == "Windows":
-                return {port.device for port in list_ports.comports()}
-            else:
-                return {str(path) for path in Path("/dev").glob("tty*")}
+            self.port_watcher.start()
+            return True
         except ImportError:
-            messagebox.showerror("Error", "The 'pyserial' library is required. Please install it.")
-            return None
+            self.ui.dispatcher.call(messagebox.showerror, "Error", "The 'pyserial' library is required. Please install it.")
         except Exception as e:
-            messagebox.showerror("Error", f"Could not list ports: {e}")
-            return None
+            self.ui.dispatcher.call(messagebox.showerror, "Error", f"Could not list ports: {e}")
+        return False
 
     def _prepare_for_unplug(self):
         """First stage of finding a single port."""
         self.ui.update_port_finder_instructions(f"Scanning for connected devices...")
-        self.ports_before_unplug = self._find_available_ports()
-        if self.ports_before_unplug is None:
+        if not self._start_port_watcher():
             self.ui.update_port_finder_instructions("Error: Could not scan for ports. Please try again.")
             self.ui.set_port_finder_button("Retry", self._find_next_port)
             return
+        self.ports_before_unplug = self.port_watcher.snapshot()
+        try:
+            # Kept so the adapter's identity is still known after it has been unplugged.
+            self.port_infos_before_unplug = scan_ports()
+        except Exception:
+            self.port_infos_before_unplug = {}
+        self.awaiting_unplug = True
 
         instruction = f"Please UNPLUG the USB cable from the '{self.current_device_for_port_finding}' robot now."
         self.ui.update_port_finder_instructions(instruction)
         self.ui.set_port_finder_button("Unplugged")
 
+    def _on_port_event(self, event):
+        """Receives hotplug events on the watcher thread and hands them to the Tk loop."""
+        self.ui.dispatcher.call(self._handle_port_event, event)
+
+    def _handle_port_event(self, event):
+        # The first USB-serial device to disappear while waiting is the one being identified.
+        if self.port_discovery_running and self.awaiting_unplug and event.action == 'remove':
+            self._port_identified(event.device)
+
     def _after_unplug(self):
-        """Second stage, after user has unplugged the device."""
-        self.ui.update_port_finder_instructions("Scanning again...")
-        self.ui.set_port_finder_button("", state="disabled") 
-        
-        time.sleep(1.0)
-        ports_after = self._find_available_ports()
-        
-        if ports_after is None:
-            self.ui.update_port_finder_instructions("Error: Could not scan for ports. Please try again.")
-            self.ui.set_port_finder_button("Retry", self._find_next_port)
+        """Second stage, when the user reports the device unplugged before an event arrived."""
+        if not self.awaiting_unplug:
             return
-            
-        diff = self.ports_before_unplug - ports_after
+        diff = self.ports_before_unplug - self.port_watcher.snapshot()
         
         if len(diff) == 1:
-            port = diff.pop()
-            if self.current_device_for_port_finding == "follower":
-                self.follower_port = port
-                self.ui.update_follower_port_display(port)
-            else:
-                self.leader_port = port
-                self.ui.update_leader_port_display(port)
-            
-            self.log(f"Found {self.current_device_for_port_finding} port: {port}")
-            # Move to the next device
-            self._find_next_port()
-            
+            self._port_identified(diff.pop())
         elif len(diff) == 0:
-            self.ui.update_port_finder_instructions("No device change was detected. Please try again.")
+            self.ui.update_port_finder_instructions("No device change was detected yet. Unplug the cable, or press Retry to start over.")
             self.ui.set_port_finder_button("Retry", self._find_next_port)
         else:
+            self.awaiting_unplug = False
             self.ui.update_port_finder_instructions(f"Multiple devices changed. Please only unplug one device at a time.")
             self.ui.set_port_finder_button("Retry", self._find_next_port)
 
-    def log(self, message):
-        """Logs a message to the console and internal log list."""
+    def _port_identified(self, port):
+        self.awaiting_unplug = False
+        info = self.port_infos_before_unplug.get(port)
+        if info is not None:
+            try:
+                self.port_identities.save(self.current_device_for_port_finding, PortIdentity.from_port_info(info))
+            except OSError as e:
+                self.log(f"Could not remember the {self.current_device_for_port_finding} arm's USB identity: {e}", level='warning')
+        if self.current_device_for_port_finding == "follower":
+            self.follower_port = port
+            self.ui.update_follower_port_display(port)
+        else:
+            self.leader_port = port
+            self.ui.update_leader_port_display(port)
+
+        self.log(f"Found {self.current_device_for_port_finding} port: {port}")
+        # Move to the next device
+        self._find_next_port()
+
+    def log(self, message, level='info'):
+        """Logs a message to the console and the bounded log store."""
         print(message)
-        self.terminal_output.append(message)
-        self.update_status_text(message.splitlines()[-1])
+        step = current_step()
+        self.terminal_output.append(message, step=step.name if step else None, level=level)
+        lines = message.splitlines()
+        if lines:
+            self.update_status_text(lines[-1])
 
     def update_progress(self, step, message):
         """Updates the progress bar and text."""
@@ -319,66 +682,75 @@ class LeRobotInstaller:
         """Updates the status text in the UI footer."""
         self.ui.update_status_text(message)
 
-    def _run_command(self, command, cwd=None):
-        """Runs a shell command, logs its output, and returns success."""
+    def _run_command(self, command, cwd=None, env=None, progress_range=(0.0, 1.0)):
+        """
+        Runs a shell command, streaming its output to the log, and returns
+        success. The command's progress fills `progress_range` of its step.
+        """
         self.log(f"Running command: {command}")
+        step = current_step()
+        start, end = progress_range
+        on_progress = (lambda fraction: self._update_step_fraction(step, start + fraction * (end - start))) if step else None
+        with self._progress_lock:
+            budget = self.step_output_budgets.get(step.name) if step else None
         try:
-            process = subprocess.run(command, shell=True, check=True, capture_output=True, text=True, cwd=cwd)
-            self.log(process.stdout)
-            if process.stderr:
-                self.log(f"Stderr: {process.stderr}")
-            return True
-        except subprocess.CalledProcessError as e:
-            self.log(f"Error running command: {command}")
-            self.log(e.stdout)
-            self.log(e.stderr)
+            result = run_streaming(command, self.log, cwd=cwd, env=env, max_output_bytes=self.max_step_output_bytes,
+                                   on_progress=on_progress, budget=budget)
+        except OSError as e:
+            self.log(f"Error running command: {command}\n{e}", level='error')
             return False
 
-    def start_motor_setup(self):
-        self.log("Starting guided motor setup...")
-        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "setup_motors_gui.py")
-
-        if not os.path.exists(script_path):
-            messagebox.showerror("Error", f"Motor setup script not found at:\n{script_path}")
-            return
-
-        # Run for follower
-        self.log("Starting setup for FOLLOWER arm...")
-        if not self._run_motor_setup_for_device("follower", self.follower_port, script_path):
-            return # Stop if follower setup fails or is canceled
+        if result.dropped_bytes:
+            self.log(f"Output limit reached, {result.dropped_bytes} bytes omitted. Last lines:\n" + "\n".join(result.tail), level='warning')
+        if not result.success:
+            self.log(f"Error running command: {command} (exit code {result.returncode})", level='error')
+            return False
+        return True
 
-        # Run for leader
-        self.log("Starting setup for LEADER arm...")
-        if not self._run_motor_setup_for_device("leader", self.leader_port, script_path):
+    def start_motor_setup(self):
+        """Scans and provisions both arms on a worker thread; progress comes back as events."""
+        if self.motor_setup.running:
             return
-
-        messagebox.showinfo("Success", "Motor setup process completed for both devices.")
-        self.ui.set_button_state('test', '🚀 Test Robot', 'text_primary')
-
-    def _run_motor_setup_for_device(self, device_name, port, script_path):
-        """Executes the motor setup script for a single device and waits for it."""
-        device_type = f"koch_{device_name}"
-        self.log(f"Launching setup for {device_name} on port {port}...")
-        
-        command = [sys.executable, script_path, "--port", port, "--device_type", device_type]
-        
-        try:
-            # Using Popen to not block the main UI thread entirely, but this is a simplified example.
-            # For a truly non-blocking approach with real-time feedback, a different architecture would be needed.
-            process = subprocess.run(command, check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
-            self.log(f"{device_name.capitalize()} setup output:\n{process.stdout}")
-            self.save_configuration(device_name, {'port': port}) # Save after successful setup
-            return True
-        except subprocess.CalledProcessError as e:
-            self.log(f"Error during {device_name} setup: {e.stderr}")
-            messagebox.showerror(f"{device_name.capitalize()} Setup Failed", f"The motor setup script failed.\n\nError:\n{e.stderr}")
-            return False
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Could not find 'python' executable. Please ensure Python is in your system's PATH.")
-            return False
+        self.log("Starting motor setup...")
+        self.ui.show_port_finding_view()
+        self.ui.update_port_finder_instructions("Scanning motor buses...")
+        self.ui.set_port_finder_button("Stop", self.motor_setup.stop)
+        ports = {'follower': self.follower_port, 'leader': self.leader_port}
+        self.motor_setup.start(ports, lambda kind, role, value: self.ui.dispatcher.call(self._on_motor_setup_event, kind, role, value))
+
+    def _on_motor_setup_event(self, kind, role, value):
+        """Handles motor setup events on the Tk thread."""
+        if kind == 'inventory':
+            self.log(f"{role.capitalize()} motors: {bus_scanner.describe(value)}")
+        elif kind == 'progress':
+            self.log(f"{role.capitalize()}: {value}")
+        elif kind == 'waiting':
+            self.ui.update_port_finder_instructions(
+                f"Connect ONLY the '{value[0]}' motor of the {role} arm. Ensure no other new motors are connected.")
+        elif kind == 'collision':
+            self.log(f"{role.capitalize()}: several motors are answering on the same ID.", level='warning')
+            self.ui.update_port_finder_instructions(
+                f"Several motors are connected at once. Disconnect all but the '{value[0]}' motor of the {role} arm, "
+                "then connect the others one at a time.")
+        elif kind == 'error':
+            self.log(f"Error during {role} setup: {value}", level='error')
+        elif kind == 'arm_done':
+            if value.complete:
+                port = self.follower_port if role == 'follower' else self.leader_port
+                # Save after successful setup, preferring a device link that survives reboots
+                self.save_configuration(role, {'port': stable_path(port) or port})
+            else:
+                self.log(f"{role.capitalize()} motors not configured: {', '.join(value.missing)}", level='warning')
+        elif kind == 'finished':
+            self.ui.show_installation_view()
+            if len(value) == 2 and all(result.complete for result in value.values()):
+                messagebox.showinfo("Success", "Motor setup process completed for both devices.")
+                self.ui.set_button_state('test', '🚀 Test Robot', 'text_primary')
+            else:
+                messagebox.showwarning("Incomplete", "Motor setup did not finish for both devices. See the log for details.")
 
     def save_configuration(self, device_name, updates):
-        """Programmatically updates and saves the Python config file for a device."""
+        """Saves `updates` (config field -> value, e.g. the port) to a device's config file in one write."""
         is_robot = "follower" in device_name
         
         if is_robot:
@@ -391,23 +763,12 @@ class LeRobotInstaller:
             return
 
         try:
-            with open(config_path, 'r') as f:
-                lines = f.readlines()
-
-            with open(config_path, 'w') as f:
-                for line in lines:
-                    # This is a simple but effective way to update the port
-                    if 'port: str | None = ' in line and 'port' in updates:
-                        f.write(f"    port: str | None = '{updates['port']}'\n")
-                    # In a real implementation, you'd add logic here to update motor IDs
-                    # elif 'motors: dict[str, MotorConfig] = ' in line and 'motors' in updates:
-                    #    f.write(f"    motors: dict[str, MotorConfig] = {updates['motors']}\n")
-                    else:
-                        f.write(line)
-            
-            self.log(f"Successfully saved configuration for {device_name} to {config_path}")
+            if config_writer.update_config(config_path, updates):
+                self.log(f"Successfully saved configuration for {device_name} to {config_path}")
+            else:
+                self.log(f"Configuration for {device_name} is already up to date.")
         except Exception as e:
-            self.log(f"Error saving configuration for {device_name}: {e}")
+            self.log(f"Error saving configuration for {device_name}: {e}", level='error')
             messagebox.showerror("Save Failed", f"Could not save settings to {config_path}.")
 
     def _start_full_port_discovery(self):
@@ -437,43 +798,54 @@ class LeRobotInstaller:
         else:
             messagebox.showwarning("Incomplete", "One or more ports were not identified.", parent=self.root)
 
+    def _arm_bus(self, role):
+        """The shared bus connection for an arm, or None if its port is not known yet."""
+        port = self.follower_port if role == 'follower' else self.leader_port
+        return self.motor_setup.bus(port) if port else None
+
+    def _arm_motor_ids(self, role):
+        if role not in self.arm_motor_ids:
+            self.arm_motor_ids[role] = [spec.id for spec in arm_motor_table(role)]
+        return self.arm_motor_ids[role]
+
     def start_web_server(self):
-        """Initializes and runs the Flask web server in a new thread."""
+        """Serves the robot test page on a background thread and opens it in the browser."""
         self.log("Starting web server for robot testing...")
         
         # Check if server is already running
-        if hasattr(self, 'server_thread') and self.server_thread.is_alive():
+        if self.web_server is not None and self.web_server.running:
             self.log("Server is already running.")
-            webbrowser.open("http://127.0.0.1:7860")
+            webbrowser.open(self.web_server.url)
             return
 
-        app = Flask(__name__, static_folder='web_interface')
-        CORS(app)
-
-        @app.route('/')
-        def index():
-            return send_from_directory(app.static_folder, 'index.html')
-
-        @app.route('/api/chat', methods=['POST'])
-        def chat():
-            # In a real implementation, this would connect to the robot
-            user_message = request.json.get('message', '')
-            self.log(f"Received message from web UI: {user_message}")
-            
-            # Simulate a response
-            response_text = f"Simulated response to: '{user_message}'"
-            return jsonify({'response': response_text})
-        
-        def run_app():
-            self.log("Web server is running on http://127.0.0.1:7860")
-            app.run(port=7860)
+        try:
+            app = test_server.create_app(self.robot_session, max_streams=self.web_server_threads - 2)
+            self.web_server = test_server.TestServer(app, threads=self.web_server_threads)
+            self.web_server.start()
+        except ImportError as e:
+            self.log(f"Error starting web server: {e}", level='error')
+            messagebox.showerror("Missing Dependency", f"{e}\n\nInstall the packages in requirements.txt and try again.")
+            return
+        except OSError as e:
+            self.log(f"Error starting web server: {e}", level='error')
+            messagebox.showerror("Server Error", f"Could not start the test server on port {test_server.DEFAULT_PORT}:\n{e}")
+            return
 
-        self.server_thread = threading.Thread(target=run_app, daemon=True)
-        self.server_thread.start()
-        
-        # Give the server a moment to start up before opening the browser
-        time.sleep(1)
-        webbrowser.open("http://127.0.0.1:7860")
+        self.log(f"Web server is running on {self.web_server.url} ({self.web_server.backend}, {self.web_server_threads} threads)")
+        # The socket is already listening, so the page can be opened right away.
+        webbrowser.open(self.web_server.url)
+
+    def on_close(self):
+        """Stops the test server, teleoperation and motor setup, then closes the window."""
+        self.robot_session.stop()
+        if self.web_server is not None:
+            # Open streams can take a moment to close; the window does not wait for them.
+            self.web_server.stop(wait=False)
+        self.motor_setup.stop()
+        self.motor_setup.close()
+        self.port_watcher.stop()
+        self.terminal_output.close()
+        self.root.destroy()
 
 def main():
     """Application entry point."""
@@ -0,0 +1,110 @@
+"""
+One timer for all of a window's animations.
+Instead of each animation keeping its own `after()` chain, animations are
+registered as named tasks on a FrameClock, which keeps a single pending
+`after()` for whichever task is due next. Each task returns the delay in
+milliseconds until it wants to run again, or None when it is finished.
+The clock pauses while its window is unmapped (minimised or withdrawn) and
+cancels everything when the window is destroyed.
+"""
+
+import time
+import tkinter as tk
+
+
+class FrameClock:
+    """Runs named, self-rescheduling tasks from a single Tk timer."""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._tasks = {}
+        self._after_id = None
+        self._next_due = None
+        self.paused = False
+        self.stopped = False
+        widget.bind('<Unmap>', self._on_unmap, add='+')
+        widget.bind('<Map>', self._on_map, add='+')
+        widget.bind('<Destroy>', self._on_destroy, add='+')
+
+    def schedule(self, name, delay_ms, callback):
+        """Runs `callback` after `delay_ms`, replacing any task with the same name."""
+        if self.stopped:
+            return
+        self._tasks[name] = [time.perf_counter() + delay_ms / 1000.0, callback]
+        self._reschedule()
+
+    def cancel(self, name):
+        self._tasks.pop(name, None)
+
+    def is_scheduled(self, name):
+        return name in self._tasks
+
+    def stop(self):
+        """Cancels every task and the pending timer; the clock cannot be restarted."""
+        self.stopped = True
+        self._tasks.clear()
+        self._cancel_timer()
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+            self._next_due = None
+
+    def _reschedule(self):
+        if self.paused or self.stopped or not self._tasks:
+            self._cancel_timer()
+            return
+        due = min(task[0] for task in self._tasks.values())
+        if self._after_id is not None and self._next_due <= due:
+            return
+        self._cancel_timer()
+        delay = max(1, int((due - time.perf_counter()) * 1000))
+        self._after_id = self.widget.after(delay, self._tick)
+        self._next_due = due
+
+    def _tick(self):
+        self._after_id = None
+        self._next_due = None
+        # Tasks due within a millisecond run in this tick rather than waking the loop again.
+        now = time.perf_counter() + 0.001
+        try:
+            for name, task in list(self._tasks.items()):
+                if self.stopped:
+                    return
+                if task[0] > now or self._tasks.get(name) is not task:
+                    continue
+                delay = task[1]()
+                if self._tasks.get(name) is not task:
+                    # The task was cancelled or replaced while it ran.
+                    continue
+                if delay is None:
+                    del self._tasks[name]
+                else:
+                    task[0] = time.perf_counter() + delay / 1000.0
+        except tk.TclError:
+            # The window went away between ticks.
+            self.stop()
+            return
+        self._reschedule()
+
+    def _on_unmap(self, event):
+        if event.widget is self.widget:
+            self.paused = True
+            self._cancel_timer()
+
+    def _on_map(self, event):
+        if event.widget is self.widget and self.paused:
+            self.paused = False
+            # Resume from now rather than replaying everything that fell due while hidden.
+            now = time.perf_counter()
+            for task in self._tasks.values():
+                task[0] = max(task[0], now)
+            self._reschedule()
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.stop()
@@ -0,0 +1,76 @@
+"""
+Pointer hit-testing for canvas-drawn buttons.
+A HitTestIndex buckets named rectangles into a coarse grid, so finding the
+item under the pointer checks only the few rectangles sharing its cell.
+A HoverState sits on top and reports only transitions, which lets motion
+handlers touch Tk when the hovered item actually changes rather than on
+every <Motion> event.
+"""
+
+
+class HitTestIndex:
+    """Named rectangles in canvas coordinates, bucketed by grid cell."""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.regions = {}
+        self._cells = {}
+
+    def _cells_for(self, bbox):
+        x1, y1, x2, y2 = bbox
+        size = self.cell_size
+        for cx in range(int(x1 // size), int(x2 // size) + 1):
+            for cy in range(int(y1 // size), int(y2 // size) + 1):
+                yield cx, cy
+
+    def add(self, name, bbox):
+        """Adds or moves a named rectangle (x1, y1, x2, y2)."""
+        self.remove(name)
+        self.regions[name] = tuple(bbox)
+        for cell in self._cells_for(bbox):
+            self._cells.setdefault(cell, []).append(name)
+
+    def remove(self, name):
+        bbox = self.regions.pop(name, None)
+        if bbox is None:
+            return
+        for cell in self._cells_for(bbox):
+            names = self._cells.get(cell, [])
+            if name in names:
+                names.remove(name)
+
+    def hit(self, x, y):
+        """Returns the name of the rectangle containing (x, y), or None."""
+        for name in self._cells.get((int(x // self.cell_size), int(y // self.cell_size)), ()):
+            x1, y1, x2, y2 = self.regions[name]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return name
+        return None
+
+
+class HoverState:
+    """Remembers the hovered item and calls `on_enter`/`on_leave` only when it changes."""
+
+    def __init__(self, index, on_enter, on_leave):
+        self.index = index
+        self.on_enter = on_enter
+        self.on_leave = on_leave
+        self.hovered = None
+
+    def update(self, x, y):
+        """Moves the pointer to (x, y); returns the hovered item's name or None."""
+        self._set(self.index.hit(x, y))
+        return self.hovered
+
+    def clear(self):
+        """The pointer left the canvas."""
+        self._set(None)
+
+    def _set(self, name):
+        if name == self.hovered:
+            return
+        previous, self.hovered = self.hovered, name
+        if previous is not None:
+            self.on_leave(previous)
+        if name is not None:
+            self.on_enter(name)
@@ -0,0 +1,99 @@
+"""
+Decoded, pre-scaled images for the installer windows.
+Each (file, size) pair is scaled once with Pillow and saved as a small PNG
+under ~/.lerobot_installer/image_cache, keyed by the source path, its
+mtime and size, and the target size, so an edited image is re-scaled
+automatically. Tk reads those PNGs natively, so once the disk cache is
+warm the windows paint without importing Pillow or decoding the
+full-resolution originals. PhotoImages are also kept in memory, so
+rebuilding a window reuses them outright.
+"""
+
+import hashlib
+import os
+import tkinter as tk
+
+from installation.lazy_import import LazyModule
+
+Image = LazyModule("PIL.Image", "Image display")
+ImageTk = LazyModule("PIL.ImageTk", "Image display")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~/.lerobot_installer"), "image_cache")
+
+
+class ImageCache:
+    """Hands out Tk images of files scaled to fit a given size, decoding each variant only once."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._photos = {}
+
+    def _key(self, path, size):
+        stat = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def photo(self, path, size, master=None):
+        """Returns a PhotoImage of `path` scaled to fit within `size`, or None if it cannot be loaded."""
+        return self.photos(path, [size], master)[0]
+
+    def photos(self, path, sizes, master=None):
+        """Returns PhotoImages of `path` for several sizes, decoding the original at most once."""
+        decoded = []
+
+        def source():
+            if not decoded:
+                with Image.open(path) as original:
+                    decoded.append(original.copy())
+            return decoded[0].copy()
+
+        return [self._photo(path, size, master, source) for size in sizes]
+
+    def _photo(self, path, size, master, source):
+        try:
+            key = self._key(path, size)
+        except OSError:
+            return None
+        # Images belong to one Tk interpreter; windows of the same application share them.
+        memory_key = (key, id(master.tk) if master is not None else None)
+        photo = self._photos.get(memory_key)
+        if photo is not None:
+            return photo
+
+        cached_path = os.path.join(self.cache_dir, key + ".png")
+        if os.path.exists(cached_path):
+            try:
+                photo = tk.PhotoImage(file=cached_path, master=master)
+            except tk.TclError:
+                photo = None
+        if photo is None:
+            photo = self._render(size, cached_path, master, source)
+        if photo is not None:
+            self._photos[memory_key] = photo
+        return photo
+
+    def _render(self, size, cached_path, master, source):
+        """Scales the decoded original with Pillow, saving the result for next time."""
+        if not ImageTk.available:
+            return None
+        try:
+            image = source()
+            image.thumbnail(size)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, cached_path)
+        except OSError:
+            pass
+        return ImageTk.PhotoImage(image, master=master)
+
+    def clear(self):
+        """Drops the in-memory images; the disk cache is kept."""
+        self._photos.clear()
+
+
+# Shared by every window, so the welcome screen and installer reuse each other's images.
+image_cache = ImageCache()
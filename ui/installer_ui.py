@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import font, ttk
-from PIL import ImageTk, Image
 import os
 
+from ui.hit_test import HitTestIndex, HoverState
+from ui.image_cache import image_cache
+from ui.ui_dispatcher import UIDispatcher, ui_thread
+
 class InstallerUI:
     """Handles the UI creation and state for the LeRobot Installer."""
 
@@ -19,6 +22,7 @@ class InstallerUI:
         }
         
         self.root.configure(bg=self.colors['background'])
+        self.dispatcher = UIDispatcher(self.root)
         
         self.setup_fonts()
         self.setup_ui()
@@ -52,6 +56,11 @@ class InstallerUI:
 
     def setup_ui(self):
         """Sets up the main UI layout and widgets."""
+        # Canvas buttons and links are found by position; hover changes are the only repaints
+        self.hit_index = HitTestIndex()
+        self.hover = HoverState(self.hit_index, self._on_item_enter, self._on_item_leave)
+        self.button_enabled = {}
+
         self.canvas = tk.Canvas(self.root, bg=self.colors['background'], highlightthickness=0)
         self.canvas.pack(fill='both', expand=True)
 
@@ -70,6 +79,7 @@ class InstallerUI:
 
         self.canvas.bind('<Button-1>', self._on_canvas_click)
         self.canvas.bind('<Motion>', self._on_mouse_motion)
+        self.canvas.bind('<Leave>', self._on_mouse_leave)
         
         # Start in installation view
         self.show_installation_view()
@@ -77,10 +87,8 @@ class InstallerUI:
     def _create_header(self):
         # Display Logo
         logo_path = os.path.join("photos", "logo.png")
-        if os.path.exists(logo_path):
-            self.logo_img = Image.open(logo_path)
-            self.logo_img.thumbnail((150, 50))
-            self.logo_photo = ImageTk.PhotoImage(self.logo_img)
+        self.logo_photo = image_cache.photo(logo_path, (150, 50), master=self.canvas)
+        if self.logo_photo is not None:
             self.canvas.create_image(32, 32, image=self.logo_photo, anchor='nw')
         else:
             self.canvas.create_text(32, 32, text="LeRobot Installer", font=self.font_logo, fill=self.colors['text_primary'], anchor='w')
@@ -89,8 +97,22 @@ class InstallerUI:
         self.canvas.create_text(500, 140, text="LeRobot", font=self.font_super_title, fill=self.colors['text_primary'], anchor='center')
         self.canvas.create_text(500, 180, text="Automated Installer", font=self.font_title, fill=self.colors['text_secondary'], anchor='center')
         self.install_dir_text_id = self.canvas.create_text(500, 220, text=f"Directory: {self.controller.install_dir}", font=self.font_small, fill=self.colors['text_secondary'], anchor='center')
-        self.change_dir_btn_bg = self.canvas.create_rectangle(450, 235, 550, 255, fill='', outline=self.colors['border'], width=1)
-        self.change_dir_btn_text = self.canvas.create_text(500, 245, text="Change", font=self.font_small, fill=self.colors['text_secondary'], anchor='center')
+
+        # Small outlined buttons under the install directory
+        links = {
+            'import_bundle': {'text': "Import", 'pos': (340, 235, 440, 255)},
+            'change_dir': {'text': "Change", 'pos': (450, 235, 550, 255)},
+            'export_bundle': {'text': "Export", 'pos': (560, 235, 660, 255)},
+        }
+        self.link_widgets = {}
+        self.link_coords = {}
+        for name, L in links.items():
+            x1, y1, x2, y2 = L['pos']
+            bg = self.canvas.create_rectangle(L['pos'], fill='', outline=self.colors['border'], width=1)
+            text = self.canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=L['text'], font=self.font_small, fill=self.colors['text_secondary'], anchor='center')
+            self.link_widgets[name] = {'bg': bg, 'text': text}
+            self.link_coords[name] = L['pos']
+            self.hit_index.add(name, L['pos'])
 
     def _create_installation_view(self):
         self.install_view_frame = tk.Frame(self.main_card, bg=self.colors['background'])
@@ -126,17 +148,21 @@ class InstallerUI:
         self.leader_port_label.pack(side='left', padx=20)
         ports_frame.pack(pady=10)
 
+    @ui_thread
     def show_installation_view(self):
         self.port_view_frame.pack_forget()
         self.install_view_frame.pack(fill='both', expand=True, padx=20, pady=20)
 
+    @ui_thread
     def show_port_finding_view(self):
         self.install_view_frame.pack_forget()
         self.port_view_frame.pack(fill='both', expand=True, padx=20, pady=20)
 
+    @ui_thread
     def update_port_finder_instructions(self, text):
         self.port_instructions_label.config(text=text)
 
+    @ui_thread
     def set_port_finder_button(self, text, command=None, state='normal'):
         widget_info = self.port_finder_button_widget
         canvas = widget_info['canvas']
@@ -150,9 +176,11 @@ class InstallerUI:
             final_command = command or self.controller.handle_port_finder_action_click
             canvas.bind('<Button-1>', lambda e: final_command())
 
+    @ui_thread
     def update_follower_port_display(self, port):
         self.follower_port_label.config(text=f"Follower Port: {port}", fg=self.colors['success'])
 
+    @ui_thread
     def update_leader_port_display(self, port):
         self.leader_port_label.config(text=f"Leader Port: {port}", fg=self.colors['success'])
 
@@ -183,6 +211,8 @@ class InstallerUI:
             text = self.canvas.create_text(B['pos'][0] + w/2, y + h/2, text=B['text'], font=self.font_button, fill=self.colors['text_secondary'], anchor='center')
             self.button_widgets[name] = {'bg': bg, 'text': text}
             self.button_coords[name] = B['pos']
+            self.button_enabled[name] = False
+            self.hit_index.add(name, B['pos'])
 
         # Add dividers
         self.canvas.create_line(start_x + w, y + 10, start_x + w, y + h - 10, fill=self.colors['border'])
@@ -198,45 +228,53 @@ class InstallerUI:
         self.status_text_id = self.canvas.create_text(500, 600, text="Welcome to the LeRobot Installer", font=self.font_small, fill=self.colors['text_secondary'], anchor='center')
 
     def _on_mouse_motion(self, event):
-        for name, (x1, y1, x2, y2) in self.button_coords.items():
-            widget = self.button_widgets[name]
-            current_fill = self.canvas.itemcget(widget['text'], 'fill')
-            if current_fill == self.colors['text_primary']:
-                fill_color = self.colors['hover'] if x1 <= event.x <= x2 and y1 <= event.y <= y2 else self.colors['surface']
-                self.canvas.itemconfig(widget['bg'], fill=fill_color)
-            else:
-                self.canvas.itemconfig(widget['bg'], fill=self.colors['surface'])
-            
-        (x1, y1, x2, y2) = (450, 235, 550, 255)
-        fill_color = self.colors['hover'] if x1 <= event.x <= x2 and y1 <= event.y <= y2 else ''
-        self.canvas.itemconfig(self.change_dir_btn_bg, fill=fill_color)
+        self.hover.update(event.x, event.y)
+
+    def _on_mouse_leave(self, event):
+        self.hover.clear()
+
+    def _on_item_enter(self, name):
+        if name in self.link_widgets:
+            self.canvas.itemconfig(self.link_widgets[name]['bg'], fill=self.colors['hover'])
+        elif self.button_enabled.get(name):
+            self.canvas.itemconfig(self.button_widgets[name]['bg'], fill=self.colors['hover'])
+
+    def _on_item_leave(self, name):
+        if name in self.link_widgets:
+            self.canvas.itemconfig(self.link_widgets[name]['bg'], fill='')
+        elif self.button_enabled.get(name):
+            self.canvas.itemconfig(self.button_widgets[name]['bg'], fill=self.colors['surface'])
 
     def _on_canvas_click(self, event):
-        for name, (x1, y1, x2, y2) in self.button_coords.items():
-            if x1 <= event.x <= x2 and y1 <= event.y <= y2:
-                getattr(self.controller, f"handle_{name}_click", lambda: None)()
-                return
-        
-        (x1, y1, x2, y2) = (450, 235, 550, 255)
-        if x1 <= event.x <= x2 and y1 <= event.y <= y2:
-            self.controller.handle_change_dir_click()
+        name = self.hit_index.hit(event.x, event.y)
+        if name is not None:
+            getattr(self.controller, f"handle_{name}_click", lambda: None)()
 
     def update_progress(self, step, total_steps, message):
+        # Safe to call from any thread; bursts are coalesced into one update per frame.
+        self.dispatcher.post('progress', self._apply_progress, step, total_steps, message)
+
+    def _apply_progress(self, step, total_steps, message):
         if total_steps > 0:
             self.progress_bar['value'] = (step / total_steps) * 100
         else:
             self.progress_bar['value'] = 0
         self.progress_label.config(text=message)
-        self.root.update_idletasks()
 
     def update_status_text(self, message):
-        self.canvas.itemconfig(self.status_text_id, text=message)
-        self.root.update_idletasks()
+        self.dispatcher.post('status', self.canvas.itemconfig, self.status_text_id, text=message)
 
+    @ui_thread
     def set_button_state(self, name, text, color):
         if name in self.button_widgets:
             widget = self.button_widgets[name]
             self.canvas.itemconfig(widget['text'], text=text, fill=self.colors.get(color, self.colors['text_secondary']))
+            self.button_enabled[name] = color == 'text_primary'
+            if name == self.hover.hovered:
+                # The pointer is already over it, so no enter/leave will come to update the highlight.
+                fill = self.colors['hover'] if self.button_enabled[name] else self.colors['surface']
+                self.canvas.itemconfig(widget['bg'], fill=fill)
 
+    @ui_thread
     def update_install_dir_text(self, new_dir):
         self.canvas.itemconfig(self.install_dir_text_id, text=f"Directory: {new_dir}") 
\ No newline at end of file
@@ -0,0 +1,83 @@
+import functools
+import queue
+import sys
+import threading
+import tkinter as tk
+
+
+class UIDispatcher:
+    """
+    Queues UI updates from any thread and applies them on the Tk main loop.
+
+    The queue is drained once per frame with `after()`. Updates posted with a
+    key are coalesced, so when a burst of progress or status updates arrives
+    within one frame only the latest of each is applied.
+    """
+
+    def __init__(self, root, interval_ms=16):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self._ui_thread = threading.current_thread()
+        self._after_id = None
+        self._schedule()
+
+    def in_ui_thread(self):
+        return threading.current_thread() is self._ui_thread
+
+    def post(self, key, func, *args, **kwargs):
+        """Queues an update; a later update with the same key in the same frame replaces it."""
+        self._queue.put((key, func, args, kwargs))
+
+    def call(self, func, *args, **kwargs):
+        """Queues a call that always runs, in order with other queued calls."""
+        self._queue.put((None, func, args, kwargs))
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _schedule(self):
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+        except tk.TclError:
+            # The root window has been destroyed.
+            self._after_id = None
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        latest = {key: i for i, (key, _, _, _) in enumerate(items) if key is not None}
+        try:
+            for i, (key, func, args, kwargs) in enumerate(items):
+                if key is not None and latest[key] != i:
+                    continue
+                try:
+                    func(*args, **kwargs)
+                except tk.TclError:
+                    # The target widget was destroyed before the update arrived.
+                    pass
+                except Exception:
+                    # Report it like any Tk callback error, then carry on with the rest of the batch.
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self._schedule()
+
+
+def ui_thread(method):
+    """Runs a UI method directly on the Tk thread and queues it when called from a worker."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.dispatcher.in_ui_thread():
+            return method(self, *args, **kwargs)
+        self.dispatcher.call(method, self, *args, **kwargs)
+    return wrapper
@@ -1,10 +1,20 @@
 import tkinter as tk
 from tkinter import font
-from PIL import ImageTk, Image
 import os
 import time
 import threading
 
+from ui.frame_clock import FrameClock
+from ui.hit_test import HitTestIndex, HoverState
+from ui.image_cache import image_cache
+
+# Zoom animations step through one pre-scaled frame per scale, built once per window.
+ZOOM_SCALES = tuple(round(0.85 + 0.025 * i, 3) for i in range(11))
+BASE_FRAME = ZOOM_SCALES.index(1.0)
+FRAME_MS = 16
+# A tick that takes longer than this makes running zooms jump to their targets.
+FRAME_BUDGET = 0.008
+
 class WelcomeScreen:
     def __init__(self, root, selection_callback):
         self.root = root
@@ -35,12 +45,18 @@ class WelcomeScreen:
         self.robot_image_ids = {}
         self.robot_original_sizes = {}
         self.robot_scale_factors = {}
-        self.animation_active = {}
+        self.robot_zoom_frames = {}
+        self.robot_frame_index = {}
+        self.zoom_animations = {}
+        self.zoom_over_budget = False
+
+        # Every animation runs from this one timer, which stops with the window
+        self.clock = FrameClock(self.root)
         
         self.setup_fonts()
         self.create_widgets()
         self.start_typing_animation()
-        self.animate_cursor()
+        self.start_cursor_animation()
 
     def setup_fonts(self):
         font_family = "Roboto Mono"
@@ -64,10 +80,8 @@ class WelcomeScreen:
 
         # Logo with improved positioning
         logo_path = os.path.join("photos", "logo.png")
-        if os.path.exists(logo_path):
-            self.logo_img = Image.open(logo_path)
-            self.logo_img.thumbnail((250, 80))
-            self.logo_photo = ImageTk.PhotoImage(self.logo_img)
+        self.logo_photo = image_cache.photo(logo_path, (250, 80), master=self.canvas)
+        if self.logo_photo is not None:
             self.canvas.create_image(60, 50, image=self.logo_photo, anchor='nw')
         else:
             self.canvas.create_text(60, 50, text="Tune Robotics", font=self.font_logo, fill=self.colors['text_primary'], anchor='nw')
@@ -112,16 +126,20 @@ class WelcomeScreen:
             # Load and display robot images as buttons
             if card_data['img_path'] and os.path.exists(card_data['img_path']):
                 try:
-                    img = Image.open(card_data['img_path'])
-                    img.thumbnail((200, 200))  # Larger size for button
-                    self.robot_images[name] = ImageTk.PhotoImage(img)
+                    # Larger size for button, plus a frame for every zoom step
+                    sizes = [(round(200 * scale),) * 2 for scale in ZOOM_SCALES]
+                    frames = image_cache.photos(card_data['img_path'], sizes, master=self.canvas)
+                    if any(frame is None for frame in frames):
+                        raise RuntimeError("the image could not be decoded (is Pillow installed?)")
+                    self.robot_zoom_frames[name] = frames
+                    self.robot_images[name] = frames[BASE_FRAME]
                     img_id = self.canvas.create_image(center_x, center_y, image=self.robot_images[name], anchor='center', tags=f"robot_img_{name}")
                     
                     # Store for animations
                     self.robot_image_ids[name] = img_id
                     self.robot_original_sizes[name] = (200, 200)
                     self.robot_scale_factors[name] = 1.0
-                    self.animation_active[name] = False
+                    self.robot_frame_index[name] = BASE_FRAME
                     
                     # Store image bounds for click detection
                     img_bounds = self.canvas.bbox(img_id)
@@ -134,26 +152,28 @@ class WelcomeScreen:
                     print(f"Error loading image {card_data['img_path']}: {e}")
                     # Fallback placeholder as button
                     placeholder_size = 80
+                    self.robot_zoom_frames[name] = [font.Font(size=round(placeholder_size * scale)) for scale in ZOOM_SCALES]
                     text_id = self.canvas.create_text(center_x, center_y, text="📷", 
-                                          font=font.Font(size=placeholder_size), fill=self.colors['text_secondary'], 
+                                          font=self.robot_zoom_frames[name][BASE_FRAME], fill=self.colors['text_secondary'], 
                                           anchor='center', tags=f"robot_img_{name}")
                     self.robot_image_ids[name] = text_id
                     self.robot_original_sizes[name] = (placeholder_size, placeholder_size)
                     self.robot_scale_factors[name] = 1.0
-                    self.animation_active[name] = False
+                    self.robot_frame_index[name] = BASE_FRAME
                     self.robot_button_coords[name] = (center_x-placeholder_size, center_y-placeholder_size, 
                                                     center_x+placeholder_size, center_y+placeholder_size)
             else:
                 # Robot icon as button
                 robot_icon = "🦾"  # So-101 uses robotic arm emoji
                 icon_size = 80
+                self.robot_zoom_frames[name] = [font.Font(size=round(icon_size * scale)) for scale in ZOOM_SCALES]
                 icon_id = self.canvas.create_text(center_x, center_y, text=robot_icon, 
-                                      font=font.Font(size=icon_size), fill=self.colors['accent'], 
+                                      font=self.robot_zoom_frames[name][BASE_FRAME], fill=self.colors['accent'], 
                                       anchor='center', tags=f"robot_img_{name}")
                 self.robot_image_ids[name] = icon_id
                 self.robot_original_sizes[name] = (icon_size, icon_size)
                 self.robot_scale_factors[name] = 1.0
-                self.animation_active[name] = False
+                self.robot_frame_index[name] = BASE_FRAME
                 self.robot_button_coords[name] = (center_x-icon_size, center_y-icon_size, 
                                                 center_x+icon_size, center_y+icon_size)
             
@@ -171,47 +191,49 @@ class WelcomeScreen:
                                font=font.Font(family="Roboto Mono", size=10), 
                                fill=self.colors['text_secondary'], anchor='center')
         
+        self.hit_index = HitTestIndex()
+        for name, bbox in self.robot_button_coords.items():
+            self.hit_index.add(name, bbox)
+        self.hover = HoverState(self.hit_index, self._on_robot_enter, self._on_robot_leave)
+
         self.canvas.bind('<Button-1>', self._on_canvas_click)
         self.canvas.bind('<Motion>', self._on_mouse_motion)
+        self.canvas.bind('<Leave>', self._on_mouse_leave)
 
 
 
     def start_typing_animation(self):
         """Starts the typing animation for subtitles."""
-        self.animate_typing()
+        self.clock.schedule('typing', 0, self.animate_typing)
 
     def animate_typing(self):
-        """Handles the typing animation logic."""
+        """Advances the typing animation by one step; returns the delay until the next one in ms."""
         if not hasattr(self, 'canvas') or self.subtitle_text_id is None:
-            return
+            return None
             
         current_phrase = self.typing_phrases[self.current_phrase_index]
+
+        if self.typing_paused:
+            # The pause at the end of the phrase is over; start erasing.
+            self.typing_paused = False
+            self.typing_forward = False
         
         if self.typing_forward:
             if len(self.current_text) < len(current_phrase):
                 self.current_text += current_phrase[len(self.current_text)]
                 self.update_subtitle_text()
-                self.root.after(100, self.animate_typing)  # Typing speed
-            else:
-                # Pause at the end of the phrase
-                self.typing_paused = True
-                self.root.after(2000, self.start_erasing)  # Pause duration
-        else:
-            if len(self.current_text) > 0:
-                self.current_text = self.current_text[:-1]
-                self.update_subtitle_text()
-                self.root.after(50, self.animate_typing)  # Erasing speed
-            else:
-                # Move to next phrase
-                self.current_phrase_index = (self.current_phrase_index + 1) % len(self.typing_phrases)
-                self.typing_forward = True
-                self.root.after(500, self.animate_typing)  # Pause before next phrase
-
-    def start_erasing(self):
-        """Starts erasing the current text."""
-        self.typing_paused = False
-        self.typing_forward = False
-        self.animate_typing()
+                return 100  # Typing speed
+            # Pause at the end of the phrase
+            self.typing_paused = True
+            return 2000  # Pause duration
+        if len(self.current_text) > 0:
+            self.current_text = self.current_text[:-1]
+            self.update_subtitle_text()
+            return 50  # Erasing speed
+        # Move to next phrase
+        self.current_phrase_index = (self.current_phrase_index + 1) % len(self.typing_phrases)
+        self.typing_forward = True
+        return 500  # Pause before next phrase
 
     def update_subtitle_text(self):
         """Updates the subtitle text on the canvas."""
@@ -223,10 +245,13 @@ class WelcomeScreen:
                 cursor_x = bbox[2] + 5  # Position cursor after text
                 self.canvas.coords(self.cursor_id, cursor_x, 210)
 
+    def start_cursor_animation(self):
+        self.clock.schedule('cursor', 0, self.animate_cursor)
+
     def animate_cursor(self):
-        """Animates the blinking cursor."""
+        """Animates the blinking cursor; returns the delay until the next blink in ms."""
         if not hasattr(self, 'canvas') or self.cursor_id is None:
-            return
+            return None
             
         if self.cursor_visible:
             self.canvas.itemconfig(self.cursor_id, fill=self.colors['accent'])
@@ -234,92 +259,107 @@ class WelcomeScreen:
             self.canvas.itemconfig(self.cursor_id, fill=self.colors['background'])
         
         self.cursor_visible = not self.cursor_visible
-        self.root.after(530, self.animate_cursor)  # Cursor blink speed
+        return 530  # Cursor blink speed
 
     def animate_robot_scale(self, robot_name, target_scale, duration=200):
         """Smoothly animate robot scaling."""
-        if robot_name not in self.robot_image_ids or self.animation_active.get(robot_name, False):
-            return
-            
-        self.animation_active[robot_name] = True
-        start_scale = self.robot_scale_factors[robot_name]
-        steps = 10
-        scale_diff = target_scale - start_scale
-        step_size = scale_diff / steps
-        step_duration = duration // steps
-        
-        def animate_step(step):
-            if step >= steps:
-                self.robot_scale_factors[robot_name] = target_scale
-                self.animation_active[robot_name] = False
-                return
-                
-            current_scale = start_scale + (step_size * step)
-            self.robot_scale_factors[robot_name] = current_scale
-            
-            # Apply visual scaling effect by adjusting the image
-            img_id = self.robot_image_ids[robot_name]
-            
-            # For text-based robots (emojis), change font size
-            item_type = self.canvas.type(img_id)
-            if item_type == "text":
-                original_size = self.robot_original_sizes[robot_name][0]
-                new_size = int(original_size * current_scale)
-                current_font = self.canvas.itemcget(img_id, "font")
-                new_font = font.Font(size=new_size)
-                self.canvas.itemconfig(img_id, font=new_font)
-            
-            self.root.after(step_duration, lambda: animate_step(step + 1))
-        
-        animate_step(0)
+        self._queue_zoom(robot_name, [(target_scale, duration)])
 
     def animate_robot_bounce(self, robot_name):
         """Create a bounce effect when robot is clicked."""
-        if robot_name not in self.robot_image_ids:
+        # Quick scale down, then back up to the hover size since the pointer is still over it
+        self._queue_zoom(robot_name, [(0.85, 100), (1.1, 100)], restart=True)
+
+    def _queue_zoom(self, robot_name, segments, restart=False):
+        """Starts zooming through (target_scale, duration_ms) segments from the current scale."""
+        if robot_name not in self.robot_zoom_frames:
             return
-            
-        # Quick scale down then back up
-        self.animate_robot_scale(robot_name, 0.85, 100)
-        self.root.after(120, lambda: self.animate_robot_scale(robot_name, 1.1, 100))
-        self.root.after(250, lambda: self.animate_robot_scale(robot_name, 1.0, 100))
+        running = self.zoom_animations.get(robot_name)
+        if running:
+            final_target = running['queue'][-1][0] if running['queue'] else running['to']
+        else:
+            final_target = self.robot_scale_factors[robot_name]
+        if not restart and final_target == segments[-1][0]:
+            # Already heading there; repeated motion events must not restart the zoom.
+            return
+        self.zoom_animations[robot_name] = {'queue': list(segments)}
+        self._next_zoom_segment(robot_name, time.perf_counter())
+        if not self.clock.is_scheduled('zoom'):
+            self.clock.schedule('zoom', FRAME_MS, self._animate_zoom)
+
+    def _next_zoom_segment(self, robot_name, now):
+        animation = self.zoom_animations[robot_name]
+        target, duration = animation['queue'].pop(0)
+        animation.update({'from': self.robot_scale_factors[robot_name], 'to': target, 'start': now, 'duration': duration / 1000.0})
+
+    def _animate_zoom(self):
+        """Advances every running zoom by elapsed time, so late ticks skip frames instead of lagging."""
+        started = time.perf_counter()
+        for name in list(self.zoom_animations):
+            animation = self.zoom_animations[name]
+            elapsed = started - animation['start']
+            if self.zoom_over_budget or animation['duration'] <= 0:
+                progress = 1.0
+            else:
+                progress = min(1.0, elapsed / animation['duration'])
+            self._show_zoom(name, animation['from'] + (animation['to'] - animation['from']) * progress)
+            if progress >= 1.0:
+                if animation['queue']:
+                    self._next_zoom_segment(name, started)
+                else:
+                    del self.zoom_animations[name]
+
+        self.zoom_over_budget = time.perf_counter() - started > FRAME_BUDGET
+        return FRAME_MS if self.zoom_animations else None
+
+    def _show_zoom(self, robot_name, scale):
+        """Shows the precomputed frame closest to `scale`; Tk is only called when the frame changes."""
+        self.robot_scale_factors[robot_name] = scale
+        index = min(range(len(ZOOM_SCALES)), key=lambda i: abs(ZOOM_SCALES[i] - scale))
+        if index == self.robot_frame_index[robot_name]:
+            return
+        self.robot_frame_index[robot_name] = index
+        item = self.robot_image_ids[robot_name]
+        frame = self.robot_zoom_frames[robot_name][index]
+        if isinstance(frame, font.Font):
+            self.canvas.itemconfig(item, font=frame)
+        else:
+            self.canvas.itemconfig(item, image=frame)
 
     def _on_canvas_click(self, event):
-        for name, (x1, y1, x2, y2) in self.robot_button_coords.items():
-            if x1 <= event.x <= x2 and y1 <= event.y <= y2:
-                # Add click effect - bounce animation and highlight
-                self.animate_robot_bounce(name)
-                self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['accent'])
-                self.root.after(150, lambda n=name: self._reset_selection_hint(n))
-                self.root.after(400, lambda n=name: self.selection_callback(n))  # Wait for bounce to finish
-                return
+        name = self.hit_index.hit(event.x, event.y)
+        if name is None:
+            return
+        # Add click effect - bounce animation and highlight
+        self.animate_robot_bounce(name)
+        self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['accent'])
+        self.clock.schedule(f'hint_{name}', 150, lambda n=name: self._reset_selection_hint(n))
+        self.clock.schedule('select', 400, lambda n=name: self.selection_callback(n))  # Wait for bounce to finish
 
     def _reset_selection_hint(self, name):
         """Resets selection hint color after click effect."""
-        self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['text_secondary'])
+        # A hovered card keeps its highlight; no motion event will come to restore it.
+        fill = self.colors['accent'] if name == self.hover.hovered else self.colors['text_secondary']
+        self.canvas.itemconfig(f"select_hint_{name}", fill=fill)
 
     def _on_mouse_motion(self, event):
-        hover_found = False
-        for name, (x1, y1, x2, y2) in self.robot_button_coords.items():
-            if x1 <= event.x <= x2 and y1 <= event.y <= y2:
-                # Highlight the selection hint on hover
-                self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['accent'])
-                # Scale up animation on hover
-                if self.robot_scale_factors[name] < 1.1:
-                    self.animate_robot_scale(name, 1.1, 150)
-                # Change cursor to indicate clickable
-                self.canvas.config(cursor="hand2")
-                hover_found = True
-            else:
-                self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['text_secondary'])
-                # Scale back down when not hovering
-                if self.robot_scale_factors[name] > 1.0:
-                    self.animate_robot_scale(name, 1.0, 150)
-        
-        if not hover_found:
-            self.canvas.config(cursor="")
+        self.hover.update(event.x, event.y)
+
+    def _on_mouse_leave(self, event):
+        self.hover.clear()
+
+    def _on_robot_enter(self, name):
+        # Highlight the selection hint, scale up and show a clickable cursor
+        self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['accent'])
+        self.animate_robot_scale(name, 1.1, 150)
+        self.canvas.config(cursor="hand2")
+
+    def _on_robot_leave(self, name):
+        self.canvas.itemconfig(f"select_hint_{name}", fill=self.colors['text_secondary'])
+        self.animate_robot_scale(name, 1.0, 150)
+        self.canvas.config(cursor="")
 
     def destroy(self):
         # Stop animations before destroying
-        if hasattr(self, 'root'):
-            self.root.after_cancel  
+        self.clock.stop()
         self.root.destroy() 
\ No newline at end of file